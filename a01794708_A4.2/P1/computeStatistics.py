@@ -1,12 +1,377 @@
 """Module to compute descriptive statistics from a file with numbers."""
 # pylint: disable=invalid-name
 
+import contextlib
+import glob
+import heapq
+import importlib.util
+import io
+import json
+import os
+import re
 import sys
+import tempfile
 import time
+import warnings
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 
-def read_data(filename):
-    """Read and validate data from the file."""
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional; se usa el backend de Python puro.
+    np = None
+
+
+def _import_numeric_ingest():
+    """Load the shared ../numeric_ingest.py once, without touching sys.path.
+
+    The scripts run standalone from P1/P2/P3, so the module is loaded by
+    file path and registered in sys.modules (workers that unpickle
+    ``numeric_ingest.*`` functions find it there).
+    """
+    module = sys.modules.get("numeric_ingest")
+    if module is None:
+        path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "numeric_ingest.py")
+        spec = importlib.util.spec_from_file_location("numeric_ingest", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["numeric_ingest"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+numeric_ingest = _import_numeric_ingest()
+
+RUN_SIZE = 1_000_000  # Values kept in memory before spilling a sorted run.
+BLOCK_SIZE = 65536  # Values read at a time from each run while merging.
+BACKENDS = {"--stream": "stream", "--numpy": "numpy", "--parallel": "parallel"}
+BATCH_RESULTS_FILE = 'StatisticsBatchResults.txt'
+MERGED_SUMMARY_FILE = 'StatisticsSummary.json'
+BLANK_LINE = re.compile(rb"^[ \t\r\f\v]*$", re.MULTILINE)
+# Spellings NumPy's parser accepts but float() rejects, e.g. "nan(123)".
+STRTOD_ONLY = re.compile(rb"[()]")
+BATCH_COLUMNS = ("FILE", "MEAN", "MEDIAN", "MODE", "VARIANCE", "SD",
+                 "INVALID", "TIME")
+
+
+class StreamingStatistics:
+    """One-pass accumulator for descriptive statistics.
+
+    Count, mean and variance are updated per value with Welford's method,
+    so the data is never kept as a whole. Median and mode are exact: values
+    are buffered up to ``run_size`` items, spilled to temporary files as
+    sorted runs and merged (external sort) when the results are requested.
+    """
+
+    def __init__(self, run_size=RUN_SIZE):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.run_size = run_size
+        self._buffer = array('d')
+        self._runs = []
+
+    def add(self, value):
+        """Add one value to the accumulator."""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self._buffer.append(value)
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        """Write the buffered values to disk as a sorted run."""
+        run = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+        array('d', sorted(self._buffer)).tofile(run)
+        self._runs.append(run)
+        self._buffer = array('d')
+
+    def variance_std(self, sample=True):
+        """Return variance and standard deviation from the running M2."""
+        if self.count == 0 or (sample and self.count == 1):
+            return None, None
+        divisor = self.count - 1 if sample else self.count
+        variance = self.m2 / divisor
+        return variance, variance ** 0.5
+
+    def _sorted_values(self):
+        """Yield every value in ascending order merging the sorted runs."""
+        if not self._runs:
+            return iter(sorted(self._buffer))
+        streams = [_iter_run(run) for run in self._runs]
+        streams.append(iter(sorted(self._buffer)))
+        return heapq.merge(*streams)
+
+    def median_mode(self):
+        """Compute the exact median and mode in one merge pass."""
+        if self.count == 0:
+            raise ValueError("No se puede calcular la moda de una lista vacía.")
+        low, high = (self.count - 1) // 2, self.count // 2
+        median_low = median_high = None
+        mode, mode_freq = None, 0
+        current, current_freq = None, 0
+        for position, value in enumerate(self._sorted_values()):
+            if position == low:
+                median_low = value
+            if position == high:
+                median_high = value
+            if value == current:
+                current_freq += 1
+            else:
+                current, current_freq = value, 1
+            # Ties go to the larger value, like calculate_mode.
+            if current_freq >= mode_freq:
+                mode, mode_freq = current, current_freq
+        return (median_low + median_high) / 2, mode
+
+    def close(self):
+        """Release the temporary run files."""
+        for run in self._runs:
+            run.close()
+        self._runs = []
+
+
+def _iter_run(run):
+    """Yield the values stored in a sorted run file block by block."""
+    run.seek(0)
+    while True:
+        block = array('d')
+        try:
+            block.fromfile(run, BLOCK_SIZE)
+        except EOFError:
+            yield from block
+            return
+        yield from block
+
+
+class QuantileSketch:
+    """Quantile compactor: levels of items where level ``i`` weighs 2**i.
+
+    ``rank_error`` bounds how many positions a rank estimate can be off
+    (each compaction of weight-``w`` items adds ``w``); it is 0 while the
+    data fits in level 0.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.levels = [[]]
+        self.flips = [0]
+        self.rank_error = 0
+
+    def add(self, value):
+        """Add one value, compacting when level 0 is over-full."""
+        self.levels[0].append(value)
+        if len(self.levels[0]) > self.capacity:
+            self.compact()
+
+    def compact(self):
+        """Halve every over-full level, promoting items with double weight."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity:
+                items.sort()
+                kept = [items.pop()] if len(items) % 2 else []
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                    self.flips.append(0)
+                self.levels[level + 1].extend(items[self.flips[level]::2])
+                self.flips[level] ^= 1
+                self.levels[level] = kept
+                self.rank_error += 2 ** level
+            level += 1
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append([])
+                self.flips.append(other.flips[level])
+            self.levels[level].extend(items)
+        self.rank_error += other.rank_error
+        self.compact()
+
+    def median(self, count):
+        """Median estimate of ``count`` values from the weighted items."""
+        weighted = sorted((value, 2 ** level)
+                          for level, items in enumerate(self.levels)
+                          for value in items)
+        low, high = (count - 1) // 2, count // 2
+        median_low = median_high = None
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if median_low is None and seen > low:
+                median_low = value
+            if seen > high:
+                median_high = value
+                break
+        return (median_low + median_high) / 2
+
+
+class ModeSketch:
+    """Misra-Gries counters; ``error`` bounds how much each count
+    underestimates the true frequency (0 while every value has one)."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counters = {}
+        self.error = 0
+
+    def add(self, value):
+        """Count one value, trimming when there are too many counters."""
+        self.counters[value] = self.counters.get(value, 0) + 1
+        if len(self.counters) > self.capacity:
+            self.trim()
+
+    def trim(self):
+        """Misra-Gries step: subtract the (k+1)-th largest count from all."""
+        decrement = sorted(self.counters.values(),
+                           reverse=True)[self.capacity]
+        self.counters = {value: freq - decrement
+                         for value, freq in self.counters.items()
+                         if freq > decrement}
+        self.error += decrement
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        for value, freq in other.counters.items():
+            self.counters[value] = self.counters.get(value, 0) + freq
+        self.error += other.error
+        if len(self.counters) > self.capacity:
+            self.trim()
+
+    def mode(self):
+        """Mode estimate: the largest value with the highest counter."""
+        best = max(self.counters.values())
+        return max(value for value, freq in self.counters.items()
+                   if freq == best), best
+
+
+class StatisticsSummary:
+    """Serializable, mergeable summary of a dataset or partition.
+
+    Holds count, sum, mean and M2 (merged with Chan et al.'s formula, so a
+    merge of partitions gives the same mean and variance as a full run, up
+    to floating-point rounding), a QuantileSketch for the median and a
+    ModeSketch for the mode. Both sketches track an explicit error bound
+    that is carried through merges, and both bounds are 0, and the results
+    exact, while the data fits in the sketches.
+    """
+
+    QUANTILE_CAPACITY = 2048  # Items per compactor level.
+    MODE_COUNTERS = 1024  # Misra-Gries counters.
+
+    def __init__(self, quantile_capacity=QUANTILE_CAPACITY,
+                 mode_counters=MODE_COUNTERS):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.quantiles = QuantileSketch(quantile_capacity)
+        self.modes = ModeSketch(mode_counters)
+
+    @property
+    def rank_error(self):
+        """The estimated median's rank is off by at most this much."""
+        return self.quantiles.rank_error
+
+    @property
+    def mode_error(self):
+        """Each mode count underestimates the true one by at most this."""
+        return self.modes.error
+
+    def add(self, value):
+        """Add one value (same interface as StreamingStatistics)."""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.quantiles.add(value)
+        self.modes.add(value)
+
+    def merge(self, other):
+        """Merge another summary into this one (associative) and return it."""
+        count = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.count * other.count \
+                / count
+            self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.quantiles.merge(other.quantiles)
+        self.modes.merge(other.modes)
+        return self
+
+    def median(self):
+        """Median estimate from the weighted compactor items."""
+        return self.quantiles.median(self.count)
+
+    def mode(self):
+        """Mode estimate and its (under)count."""
+        return self.modes.mode()
+
+    def statistics(self):
+        """Return (mean, median, mode, variance, std) like the backends."""
+        mean = self.total / self.count
+        if self.count == 1:
+            return mean, self.median(), self.mode()[0], None, None
+        variance = self.m2 / (self.count - 1)
+        return mean, self.median(), self.mode()[0], variance, variance ** 0.5
+
+    def to_dict(self):
+        """Convert the summary to a JSON-serializable dict."""
+        return {
+            "count": self.count, "total": self.total, "mean": self.mean,
+            "m2": self.m2, "quantile_capacity": self.quantiles.capacity,
+            "mode_counters": self.modes.capacity,
+            "levels": self.quantiles.levels, "flips": self.quantiles.flips,
+            "rank_error": self.quantiles.rank_error,
+            "counters": [[value, freq]
+                         for value, freq in self.modes.counters.items()],
+            "mode_error": self.modes.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a summary from ``to_dict`` output."""
+        summary = cls(data["quantile_capacity"], data["mode_counters"])
+        for key in ("count", "total", "mean", "m2"):
+            setattr(summary, key, data[key])
+        summary.quantiles.levels = data["levels"]
+        summary.quantiles.flips = data["flips"]
+        summary.quantiles.rank_error = data["rank_error"]
+        summary.modes.counters = dict(data["counters"])
+        summary.modes.error = data["mode_error"]
+        return summary
+
+    def save(self, filename):
+        """Write the summary as JSON."""
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file)
+
+    @classmethod
+    def load(cls, filename):
+        """Read a summary written by ``save``."""
+        with open(filename, 'r', encoding='utf-8') as file:
+            return cls.from_dict(json.load(file))
+
+
+def read_data(filename, accumulator=None):
+    """Read and validate data from the file.
+
+    When an ``accumulator`` is given each valid value is fed to it line by
+    line and it is returned instead of the list of numbers.
+    """
     numbers = []
+    add = accumulator.add if accumulator is not None else numbers.append
     invalid_lines = 0
 
     try:
@@ -19,7 +384,7 @@ def read_data(filename):
                     continue
                 try:
                     num = float(line)
-                    numbers.append(num)
+                    add(num)
                 except ValueError:
                     print(f"Error in line {line_num}: Invalid data '{line}'")
                     invalid_lines += 1
@@ -28,6 +393,8 @@ def read_data(filename):
     except Exception as e:  # pylint: disable=broad-except
         raise RuntimeError(f"Error reading file: {e}") from e
 
+    if accumulator is not None:
+        return accumulator, invalid_lines
     return numbers, invalid_lines
 
 
@@ -65,33 +432,350 @@ def calculate_variance_std(numbers, mean, total_count, sample=True):
 
 
 
-def main():
-    """Main function to orchestrate the statistical calculations."""
+def read_data_parallel(filename):
+    """Read and validate data from the file parsing chunks in parallel."""
+    try:
+        numbers, invalid = numeric_ingest.parse_file(filename, float)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Error: File '{filename}' not found.") from e
+    except Exception as e:  # pylint: disable=broad-except
+        raise RuntimeError(f"Error reading file: {e}") from e
+    for line_num, line in invalid:
+        if not line:
+            print(f"Error in line {line_num}: Empty line")
+        else:
+            print(f"Error in line {line_num}: Invalid data '{line}'")
+    return numbers, len(invalid)
+
+
+def _bulk_parse(data):
+    """Parse one float per line with ``np.fromstring``; None on bad data.
+
+    Data that ``float`` would reject is refused up front, so those lines
+    fall back to ``float`` and both backends accept the same input.
+    """
+    if STRTOD_ONLY.search(data):
+        return None
+    with warnings.catch_warnings():
+        # NumPy < 2.3 only warns (and truncates) on unparsable text.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(data, dtype=np.float64, sep="\n")
+        except (ValueError, DeprecationWarning):
+            return None
+
+
+def _line_runs(data, bounds):
+    """Split the lines into runs of non-blank lines.
+
+    Returns the (first, last) line ranges of the runs and the indexes of
+    the blank lines between them.
+    """
+    blank = [int(np.searchsorted(bounds, match.start(), side="right")) - 1
+             for match in BLANK_LINE.finditer(data)
+             if match.start() < bounds[-1]]
+    runs = []
+    first = 0
+    for index in blank + [bounds.size - 1]:
+        if index > first:
+            runs.append((first, index))
+        first = index + 1
+    return runs, blank
+
+
+def _parse_lines(data, bounds):
+    """Parse every line of ``data`` in bulk, isolating the lines that fail.
+
+    ``bounds[i]`` is the byte offset where line ``i`` starts. A run of
+    lines that does not parse to exactly one value per line is split in
+    half until the failing lines are found, so the valid ones are always
+    converted by NumPy and only the bad lines go through ``float``.
+    Returns the parsed blocks in file order and the invalid lines as
+    (index, stripped text) pairs.
+    """
+    runs, blank = _line_runs(data, bounds)
+    parts = []
+    bad_lines = [(index, "") for index in blank]
+    pending = runs[::-1]
+    while pending:
+        first, last = pending.pop()
+        values = _bulk_parse(data[bounds[first]:bounds[last]])
+        if values is not None and values.size == last - first:
+            parts.append(values)
+        elif last - first > 1:
+            middle = (first + last) // 2
+            pending.append((middle, last))
+            pending.append((first, middle))
+        else:
+            line = data[bounds[first]:bounds[last]].decode('utf-8').strip()
+            try:
+                parts.append(np.array([float(line)]))
+            except ValueError:
+                bad_lines.append((first, line))
+    return parts, sorted(bad_lines)
+
+
+def read_data_array(filename):
+    """Read and validate data from the file into a float64 NumPy array.
+
+    The file is parsed numerically in bulk; invalid and empty lines are
+    reported with the same messages and line numbers as read_data.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            data = file.read()
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Error: File '{filename}' not found.") from e
+    except Exception as e:  # pylint: disable=broad-except
+        raise RuntimeError(f"Error reading file: {e}") from e
+
+    bounds = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10) + 1
+    bounds = np.concatenate(([0], bounds))
+    if data and not data.endswith(b"\n"):
+        bounds = np.append(bounds, len(data))
+    try:
+        parts, bad_lines = _parse_lines(data, bounds)
+    except UnicodeDecodeError as e:
+        raise RuntimeError(f"Error reading file: {e}") from e
+
+    for index, line in bad_lines:
+        if line:
+            print(f"Error in line {index + 1}: Invalid data '{line}'")
+        else:
+            print(f"Error in line {index + 1}: Empty line")
+    values = np.concatenate(parts) if parts else np.empty(0)
+    return values, len(bad_lines)
+
+
+def numpy_statistics(values, sample=True):
+    """Compute mean, median, mode, variance and std with array operations.
+
+    Sums use ``cumsum`` (plain left-to-right addition) instead of
+    ``np.sum`` (pairwise). On Python 3.12+ the builtin ``sum`` is
+    compensated, so the last digits may differ from the pure-Python
+    backend.
+    """
+    # inf/nan data is valid input: silence inf - inf and overflow.
+    with np.errstate(invalid="ignore", over="ignore"):
+        total_count = values.size
+        mean = float(np.cumsum(values)[-1] / total_count)
+        half = total_count // 2
+        if total_count % 2 == 1:
+            median = float(np.partition(values, half)[half])
+        else:
+            part = np.partition(values, (half - 1, half))
+            median = float((part[half - 1] + part[half]) / 2)
+        uniques, counts = np.unique(values, return_counts=True)
+        # Los únicos vienen ordenados: el último con la frecuencia máxima es
+        # el mayor, igual que calculate_mode.
+        mode = float(uniques[np.flatnonzero(counts == counts.max())[-1]])
+        if total_count == 0 or (sample and total_count == 1):
+            return mean, median, mode, None, None
+        diffs = values - mean
+        divisor = total_count - 1 if sample else total_count
+        variance = float(np.cumsum(diffs * diffs)[-1] / divisor)
+        return mean, median, mode, variance, variance ** 0.5
+
+
+def list_statistics(numbers):
+    """Compute the statistics from a list with the pure-Python functions."""
+    total_count = len(numbers)
+    mean = sum(numbers) / total_count
+    sorted_numbers = sorted(numbers)
+    median = calculate_median(sorted_numbers, total_count)
+    modes = calculate_mode(sorted_numbers)
+    variance, std_dev = calculate_variance_std(numbers, mean, total_count)
+    return mean, median, modes, variance, std_dev
+
+
+def accumulator_statistics(accumulator):
+    """Compute the statistics from a StreamingStatistics accumulator."""
+    mean = accumulator.total / accumulator.count
+    median, modes = accumulator.median_mode()
+    variance, std_dev = accumulator.variance_std()
+    accumulator.close()
+    return mean, median, modes, variance, std_dev
+
+
+def compute_statistics(filename, backend="python"):
+    """Read ``filename`` and compute its statistics with a backend.
+
+    ``backend`` is "python" (lists), "stream" (one-pass accumulator),
+    "parallel" (lists, parsed by chunks in a process pool) or "numpy"
+    (vectorized; falls back to "python" when NumPy is missing).
+    Returns the statistics tuple, or None when there are no valid numbers,
+    and the number of invalid lines.
+    """
+    if backend == "numpy" and np is None:
+        print("NumPy no está instalado; se usa el backend de Python puro.")
+        backend = "python"
+    if backend == "numpy":
+        values, invalid_lines = read_data_array(filename)
+        if not values.size:
+            return None, invalid_lines
+        return numpy_statistics(values), invalid_lines
+    if backend == "stream":
+        accumulator, invalid_lines = read_data(
+            filename, StreamingStatistics()
+        )
+        if not accumulator.count:
+            return None, invalid_lines
+        return accumulator_statistics(accumulator), invalid_lines
+    if backend == "parallel":
+        numbers, invalid_lines = read_data_parallel(filename)
+    else:
+        numbers, invalid_lines = read_data(filename)
+    if not numbers:
+        return None, invalid_lines
+    return list_statistics(numbers), invalid_lines
+
+
+def expand_inputs(patterns):
+    """Expand file names and glob patterns, keeping order without repeats."""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) \
+            else [pattern]
+        files.extend(name for name in matches if name not in files)
+    return files
+
+
+def _batch_row(filename, backend):
+    """Compute one row of the batch table (runs inside a pool worker).
+
+    The per-line error messages are discarded so thousands of files do not
+    flood the console; the row keeps the invalid-line count.
+    """
     start_time = time.time()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats, invalid_lines = compute_statistics(filename, backend)
+    except (FileNotFoundError, RuntimeError) as e:
+        return (filename, str(e), None, time.time() - start_time)
+    if stats is None:
+        stats = "No valid numbers found in the file."
+    return (filename, stats, invalid_lines, time.time() - start_time)
 
-    if len(sys.argv) != 2:
-        print("Error: Invalid number of arguments. Usage: "
-              "python computeStatistics.py fileWithData.txt")
+
+def _format_value(value):
+    """Format a statistic for the batch table."""
+    return "#N/A" if value is None else f"{value:.2f}"
+
+
+def batch_statistics(filenames, backend="python", workers=None):
+    """Compute the statistics of many files in one persistent process pool.
+
+    Returns one row per file (in input order): file name, the statistics
+    tuple (or an error message), invalid lines and elapsed seconds.
+    """
+    if backend == "parallel":
+        backend = "python"  # Each file already runs in its own worker.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            _batch_row, filenames, [backend] * len(filenames),
+            chunksize=max(1, len(filenames) // (4 * (os.cpu_count() or 1))),
+        ))
+
+
+def format_batch_table(rows):
+    """Build the combined tab-separated results table."""
+    lines = ["\t".join(BATCH_COLUMNS)]
+    for filename, stats, invalid_lines, elapsed in rows:
+        if isinstance(stats, str):
+            invalid = "#N/A" if invalid_lines is None else invalid_lines
+            lines.append(f"{filename}\t{stats}\t\t\t\t\t"
+                         f"{invalid}\t{elapsed:.4f}")
+            continue
+        values = "\t".join(_format_value(value) for value in stats)
+        lines.append(f"{filename}\t{values}\t{invalid_lines}\t{elapsed:.4f}")
+    return "\n".join(lines) + "\n"
+
+
+def main_batch(patterns, backend):
+    """Batch entry point: one combined table for many files."""
+    start_time = time.time()
+    filenames = expand_inputs(patterns)
+    if not filenames:
+        print("Error: No files match the given patterns.")
+        sys.exit(1)
+    table = format_batch_table(batch_statistics(filenames, backend))
+    table += (f"\nFiles: {len(filenames)}\n"
+              f"Time elapsed: {time.time() - start_time:.4f} seconds\n")
+    print(table)
+    with open(BATCH_RESULTS_FILE, 'w', encoding='utf-8') as out_file:
+        out_file.write(table)
+
+
+def format_summary_results(summary, elapsed_time, invalid_lines=None):
+    """Format the results of a summary, with the sketches' error bounds."""
+    mean, median, modes, variance, std_dev = summary.statistics()
+    mode_freq = summary.mode()[1]
+    invalid = "" if invalid_lines is None else \
+        f"- Invalid lines: {invalid_lines}\n"
+    return f"""Descriptive Statistics Results:
+- Count: {summary.count}
+- Mean: {mean:.2f}
+- Median: {median:.2f} (rank error <= {summary.rank_error} of {summary.count})
+- Mode: {modes:.2f} (count {mode_freq}, undercount <= {summary.mode_error})
+- Standard Deviation: {_format_value(std_dev)}
+- Variance: {_format_value(variance)}
+{invalid}- Time elapsed: {elapsed_time:.4f} seconds
+"""
+
+
+def main_summary(filename):
+    """Write the mergeable summary of one file next to it."""
+    start_time = time.time()
+    try:
+        summary, invalid_lines = read_data(filename, StatisticsSummary())
+    except (FileNotFoundError, RuntimeError) as e:
+        print(str(e))
         sys.exit(1)
+    if not summary.count:
+        print("No valid numbers found in the file.")
+        sys.exit(1)
+    summary.save(filename + '.summary.json')
+    results = format_summary_results(
+        summary, time.time() - start_time, invalid_lines
+    )
+    print(results)
+    print(f"Summary written to {filename}.summary.json")
 
-    filename = sys.argv[1]
 
+def main_merge(summary_files):
+    """Merge summary files and report the combined statistics."""
+    start_time = time.time()
     try:
-        numbers, invalid_lines = read_data(filename)
+        summaries = [StatisticsSummary.load(name) for name in summary_files]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error reading summary: {e}")
+        sys.exit(1)
+    merged = summaries[0]
+    for summary in summaries[1:]:
+        merged.merge(summary)
+    if not merged.count:
+        print("No valid numbers found in the summaries.")
+        sys.exit(1)
+    merged.save(MERGED_SUMMARY_FILE)
+    results = format_summary_results(merged, time.time() - start_time)
+    print(results)
+    with open('StatisticsResults.txt', 'w', encoding='utf-8') as out_file:
+        out_file.write(results)
+
+
+def main_single(filename, backend, start_time):
+    """Single-file entry point: print and save the statistics."""
+    try:
+        stats, invalid_lines = compute_statistics(filename, backend)
     except (FileNotFoundError, RuntimeError) as e:
         print(str(e))
         sys.exit(1)
 
-    if not numbers:
+    if stats is None:
         print("No valid numbers found in the file.")
         sys.exit(1)
 
-    total_count = len(numbers)
-    mean = sum(numbers) / total_count
-    sorted_numbers = sorted(numbers)
-    median = calculate_median(sorted_numbers, total_count)
-    modes = calculate_mode(sorted_numbers)
-    variance, std_dev = calculate_variance_std(numbers, mean, total_count)
+    mean, median, modes, variance, std_dev = stats
     elapsed_time = time.time() - start_time
 
     results = f"""Descriptive Statistics Results:
@@ -109,5 +793,41 @@ def main():
         out_file.write(results)
 
 
+def main():
+    """Main function to orchestrate the statistical calculations."""
+    start_time = time.time()
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    if options in ({"--summary"}, {"--merge"}) and args:
+        if "--merge" in options:
+            main_merge(args)
+        elif len(args) == 1:
+            main_summary(args[0])
+        else:
+            print("Error: --summary takes exactly one file.")
+            sys.exit(1)
+        return
+    if "--batch" in options:
+        options.discard("--batch")
+        if not args or len(options) > 1 or not options <= BACKENDS.keys():
+            print("Error: Invalid arguments. Usage: "
+                  "python computeStatistics.py --batch file1.txt "
+                  "'TC*.txt' ... [--stream | --numpy]")
+            sys.exit(1)
+        main_batch(args, BACKENDS[options.pop()] if options else "python")
+        return
+    if len(args) != 1 or len(options) > 1 or not options <= BACKENDS.keys():
+        print("Error: Invalid number of arguments. Usage: "
+              "python computeStatistics.py fileWithData.txt "
+              "[--stream | --numpy | --parallel | --summary]\n"
+              "       python computeStatistics.py --merge a.summary.json "
+              "b.summary.json ...")
+        sys.exit(1)
+
+    main_single(args[0], BACKENDS[options.pop()] if options else "python",
+                start_time)
+
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,46 @@
 """Este módulo lee números de un archivo, los convierte a binario y
 hexadecimal, y guarda los resultados."""
+import importlib.util
+import os
 import sys
 import time
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional; se usa la conversión de Python.
+    np = None
+else:
+    # Byte -> sus dos dígitos hexadecimales, como code points UCS-4.
+    HEX_TABLE = np.array([[ord(digit) for digit in f"{byte:02X}"]
+                          for byte in range(256)], dtype=np.uint32)
+
+def _import_numeric_ingest():
+    """Load the shared ../numeric_ingest.py once, without touching sys.path.
+
+    The scripts run standalone from P1/P2/P3, so the module is loaded by
+    file path and registered in sys.modules (workers that unpickle
+    ``numeric_ingest.*`` functions find it there).
+    """
+    module = sys.modules.get("numeric_ingest")
+    if module is None:
+        path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "numeric_ingest.py")
+        spec = importlib.util.spec_from_file_location("numeric_ingest", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["numeric_ingest"] = module
+        spec.loader.exec_module(module)
+    return module
+
+numeric_ingest = _import_numeric_ingest()
+
+WIDTHS = (8, 16, 32, 64)
+WINDOW = 10000  # Números convertidos y escritos por bloque en modo streaming.
+RESULTS_FILE = "ConvertionResults.txt"
+CACHE_SIZE = 65536  # Conversiones recordadas por la caché LRU.
+ERRORS_FILE = "ConvertionErrors.txt"
+OVERFLOW = "OVERFLOW"  # Valor fuera del rango de --width.
 
 def read_numbers_from_file(filename):
     """Reads numbers from a file, handling invalid data."""
@@ -20,64 +59,308 @@ def read_numbers_from_file(filename):
         sys.exit(1)
     return numbers, errors
 
-def convert_to_binary(number):
-    """Converts a number to binary (supports negative numbers using two's complement)."""
-    if number == 0:
-        return "0"
-    if number > 0:
-        binary = ""
-        n = number
-        while n > 0:
-            binary = str(n % 2) + binary
-            n //= 2
-        return binary
-    # Representación en complemento a dos
+def read_numbers_parallel(filename):
+    """Reads numbers parsing newline-aligned chunks in a process pool."""
+    try:
+        numbers, invalid = numeric_ingest.parse_file(filename, int)
+    except FileNotFoundError:
+        print(f"Error: El archivo '{filename}' no existe.")
+        sys.exit(1)
+    return numbers, [line for _, line in invalid]
+
+def _twos_complement(number):
+    """Returns the unsigned value of a negative number in two's complement,
+    using at least 8 bits (same width rule as the original conversion)."""
     bits = max(8, (abs(number).bit_length() + 1))
-    binary = bin((1 << bits) + number)[2:]  # Complemento a dos
-    return binary
+    return (1 << bits) + number
+
+def convert_to_binary(number):
+    """Converts a number to binary (supports negative numbers using two's complement).
+
+    Uses builtin formatting, linear in the bit length."""
+    if number < 0:
+        return format(_twos_complement(number), "b")
+    return format(number, "b")
 
 def convert_to_hexadecimal(number):
-    """Converts a number to hexadecimal (supports negative numbers)."""
-    if number == 0:
-        return "0"
-    if number > 0:
-        hex_chars = "0123456789ABCDEF"
-        hexadecimal = ""
-        n = number
-        while n > 0:
-            remainder = n % 16
-            hexadecimal = hex_chars[remainder] + hexadecimal
-            n //= 16
-        return hexadecimal
-    # Representación hexadecimal de complemento a dos
-    bits = max(8, (abs(number).bit_length() + 1))
-    hex_value = hex((1 << bits) + number)[2:].upper()
-    return hex_value
+    """Converts a number to hexadecimal (supports negative numbers).
 
-def main():
-    """Main function that executes the program."""
-    if len(sys.argv) != 2:
-        print("Uso: python convertNumbers.py fileWithData.txt")
+    Uses builtin formatting."""
+    if number < 0:
+        return format(_twos_complement(number), "X")
+    return format(number, "X")
+
+class ConversionCache:
+    """Bounded LRU cache of (binary, hexadecimal) conversions.
+
+    Sits in front of convert_to_binary/convert_to_hexadecimal for inputs
+    with many repeated values; counts hits, misses and evictions.
+    ``maxsize=0`` disables it."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def convert(self, number):
+        """Returns (binary, hexadecimal) for the number, cached."""
+        entry = self._entries.get(number)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(number)
+            return entry
+        self.misses += 1
+        entry = (convert_to_binary(number), convert_to_hexadecimal(number))
+        if self.maxsize > 0:
+            self._entries[number] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def resize(self, maxsize):
+        """Changes the capacity, evicting the least recently used entries."""
+        self.maxsize = maxsize
+        while len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Empties the cache and resets the counters."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def summary(self):
+        """Line with the counters for the results footer."""
+        return (f"Cache: hits={self.hits} misses={self.misses} "
+                f"evictions={self.evictions} "
+                f"size={len(self._entries)}/{self.maxsize}")
+
+conversion_cache = ConversionCache()
+
+def cached_convert(number):
+    """Converts a number to (binary, hexadecimal) through the shared cache."""
+    return conversion_cache.convert(number)
+
+def _fits(number, width):
+    """True if the number fits in a signed two's-complement width."""
+    return -(1 << (width - 1)) <= number < (1 << (width - 1))
+
+def _convert_fixed(number, width):
+    """Fixed-width two's-complement binary and hex (zero padded)."""
+    if not _fits(number, width):
+        return OVERFLOW, OVERFLOW
+    unsigned = number & ((1 << width) - 1)
+    return format(unsigned, f"0{width}b"), format(unsigned, f"0{width // 4}X")
+
+def _int64_array(numbers):
+    """Returns the numbers as an int64 array and a mask of the ones that
+    do not fit in 64 bits (those are stored as 0)."""
+    try:
+        values = np.asarray(numbers, dtype=np.int64)
+        return values, np.zeros(values.shape, dtype=bool)
+    except OverflowError:
+        numbers = [int(num) for num in numbers]
+        wide = np.array([not _fits(num, 64) for num in numbers], dtype=bool)
+        values = np.array([0 if too_wide else num
+                           for num, too_wide in zip(numbers, wide)], np.int64)
+        return values, wide
+
+def _convert_fixed_numpy(numbers, width):
+    """Vectorized fixed-width conversion.
+
+    The range check is done with array comparisons. The two's-complement
+    bytes of every value are expanded at once with ``unpackbits`` (binary)
+    and a 256-entry byte -> two hex digits table (hexadecimal), as UCS-4
+    code points that are viewed as fixed-length strings."""
+    values, overflow = _int64_array(numbers)
+    if width < 64:
+        limit = 1 << (width - 1)
+        overflow |= (values < -limit) | (values >= limit)
+    raw = values.astype(">i8").view(np.uint8).reshape(-1, 8)
+    bits = np.unpackbits(raw, axis=1)[:, 64 - width:].astype(np.uint32)
+    bits += ord("0")
+    digits = HEX_TABLE[raw].reshape(-1, 16)[:, 16 - width // 4:]
+    binaries = np.ascontiguousarray(bits).view(f"U{width}").ravel().tolist()
+    hexes = np.ascontiguousarray(digits).view(
+        f"U{width // 4}").ravel().tolist()
+    for index in np.flatnonzero(overflow).tolist():
+        binaries[index] = hexes[index] = OVERFLOW
+    return binaries, hexes
+
+def convert_batch(numbers, width=None):
+    """Converts a whole sequence (or NumPy int64 array) in bulk.
+
+    Returns the binary and hexadecimal columns as two lists. Without
+    ``width`` the output matches convert_to_binary/convert_to_hexadecimal.
+    With ``width`` (8, 16, 32 or 64) every value is encoded as zero-padded
+    two's complement of that width, vectorized with NumPy when available;
+    values outside the width's range are reported as ``OVERFLOW`` in both
+    columns instead of being confused with a negative number."""
+    if width is None:
+        pairs = [cached_convert(int(num)) for num in numbers]
+        return ([binary for binary, _ in pairs],
+                [hexadecimal for _, hexadecimal in pairs])
+    if width not in WIDTHS:
+        raise ValueError(f"Ancho no soportado: {width}")
+    if np is not None:
+        return _convert_fixed_numpy(numbers, width)
+    pairs = [_convert_fixed(int(num), width) for num in numbers]
+    return ([binary for binary, _ in pairs],
+            [hexadecimal for _, hexadecimal in pairs])
+
+def _write_window(window, width, result_file, echo):
+    """Converts one window of numbers and writes (and echoes) its lines."""
+    binaries, hexes = convert_batch(window, width)
+    lines = "".join(
+        f"Number: {num} | Binary: {binary} | Hexadecimal: {hexadecimal}\n"
+        for num, binary, hexadecimal in zip(window, binaries, hexes)
+    )
+    result_file.write(lines)
+    if echo:
+        sys.stdout.write(lines)
+
+def _convert_lines(file, width, echo, window, outputs):
+    """Converts the valid lines window by window and spools the invalid
+    ones; ``outputs`` is (result_file, error_file).
+    Returns (valid numbers, invalid entries)."""
+    result_file, error_file = outputs
+    converted = invalid = 0
+    pending = []
+    for line in file:
+        try:
+            pending.append(int(line.strip()))
+        except ValueError:
+            error_file.write(line.strip() + "\n")
+            invalid += 1
+            continue
+        if len(pending) >= window:
+            _write_window(pending, width, result_file, echo)
+            converted += len(pending)
+            pending = []
+    if pending:
+        _write_window(pending, width, result_file, echo)
+        converted += len(pending)
+    return converted, invalid
+
+def convert_stream(filename, width=None, echo=False, window=WINDOW,
+                   paths=(RESULTS_FILE, ERRORS_FILE)):
+    """Streaming read -> convert -> write pipeline with bounded memory.
+
+    Only ``window`` numbers are held at a time; results go through a
+    buffered writer to ``paths[0]`` and invalid entries are spooled to
+    ``paths[1]`` instead of a list. The results file ends with the same
+    footer as the non-streaming mode (the spooled entries are copied back
+    at the end). Returns (valid numbers, invalid entries)."""
+    results_path, errors_path = paths
+    start_time = time.time()
+    try:
+        with open(filename, 'r', encoding='utf-8') as file, \
+                open(results_path, 'w', encoding='utf-8',
+                     buffering=1 << 20) as result_file, \
+                open(errors_path, 'w', encoding='utf-8') as error_file:
+            converted, invalid = _convert_lines(
+                file, width, echo, window, (result_file, error_file))
+            footer = (f"Execution Time: {time.time() - start_time:.6f} "
+                      f"seconds\n{conversion_cache.summary()}\n")
+            result_file.write(footer)
+            if echo:
+                print(footer, end="")
+            if invalid:
+                result_file.write("\nInvalid Entries: ")
+                error_file.flush()
+                _copy_spooled_errors(errors_path, result_file)
+                result_file.write("\n")
+    except FileNotFoundError:
+        print(f"Error: El archivo '{filename}' no existe.")
         sys.exit(1)
-    filename = sys.argv[1]
+    if not invalid:
+        os.remove(errors_path)
+    return converted, invalid
+
+def _copy_spooled_errors(errors_path, result_file):
+    """Copies the spooled invalid entries as a comma-separated list."""
+    with open(errors_path, 'r', encoding='utf-8') as error_file:
+        for index, entry in enumerate(error_file):
+            if index:
+                result_file.write(", ")
+            result_file.write(entry.rstrip("\n"))
+
+def parse_arguments(argv):
+    """Returns (filename, options, width, cache size) from the command
+    line, or None when it is invalid."""
+    args = [arg for arg in argv if not arg.startswith("--")]
+    options = {arg for arg in argv if arg.startswith("--")}
+    settings = {}
+    for option in [opt for opt in options if "=" in opt]:
+        name, _, value = option.partition("=")
+        if name in settings or not value.isdigit():
+            return None
+        settings[name] = int(value)
+        options.discard(option)
+    allowed_options = {"--stream", "--echo"} if "--stream" in options \
+        else {"--parallel"}
+    if len(args) != 1 or not options <= allowed_options \
+            or not settings.keys() <= {"--width", "--cache-size"} \
+            or settings.get("--width", WIDTHS[0]) not in WIDTHS:
+        return None
+    return args[0], options, settings.get("--width"), \
+        settings.get("--cache-size")
+
+def main_stream(filename, width, echo):
+    """Streaming entry point: converts with bounded memory."""
+    converted, invalid = convert_stream(filename, width, echo=echo)
+    if not converted:
+        os.remove(RESULTS_FILE)
+        print("No hay números válidos para procesar.")
+        sys.exit(1)
+    print(f"Números convertidos: {converted} -> {RESULTS_FILE}")
+    if invalid:
+        print(f"Entradas inválidas: {invalid} -> {ERRORS_FILE}")
+
+def main_convert(filename, width, parallel):
+    """Converts the whole file in memory and writes the results."""
     start_time = time.time()
-    numbers, errors = read_numbers_from_file(filename)
+    if parallel:
+        numbers, errors = read_numbers_parallel(filename)
+    else:
+        numbers, errors = read_numbers_from_file(filename)
     if not numbers:
         print("No hay números válidos para procesar.")
         sys.exit(1)
-    results = []
-    for num in numbers:
-        binary = convert_to_binary(num)
-        hexadecimal = convert_to_hexadecimal(num)
-        results.append(f"Number: {num} | Binary: {binary} | Hexadecimal: {hexadecimal}")
+    binaries, hexes = convert_batch(numbers, width)
+    results = [
+        f"Number: {num} | Binary: {binary} | Hexadecimal: {hexadecimal}"
+        for num, binary, hexadecimal in zip(numbers, binaries, hexes)
+    ]
     end_time = time.time()
     elapsed_time = end_time - start_time
     output = "\n".join(results) + f"\nExecution Time: {elapsed_time:.6f} seconds\n"
+    output += conversion_cache.summary() + "\n"
     if errors:
         output += f"\nInvalid Entries: {', '.join(errors)}\n"
     print(output)
     with open("ConvertionResults.txt", "w", encoding='utf-8') as result_file:
         result_file.write(output)
 
+def main():
+    """Main function that executes the program."""
+    arguments = parse_arguments(sys.argv[1:])
+    if arguments is None:
+        print("Uso: python convertNumbers.py fileWithData.txt [--parallel] "
+              "[--width=8|16|32|64] [--cache-size=N]\n"
+              "     python convertNumbers.py fileWithData.txt --stream "
+              "[--echo] [--width=8|16|32|64] [--cache-size=N]")
+        sys.exit(1)
+    filename, options, width, cache_size = arguments
+    if cache_size is not None:
+        conversion_cache.resize(cache_size)
+    if "--stream" in options:
+        main_stream(filename, width, "--echo" in options)
+    else:
+        main_convert(filename, width, "--parallel" in options)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,105 @@
+"""Pruebas de las conversiones de convert_numbers."""
+import random
+import unittest
+from unittest import mock
+import convert_numbers
+from convert_numbers import (
+    OVERFLOW, convert_batch, convert_to_binary, convert_to_hexadecimal)
+
+
+def reference_to_binary(number):
+    """Reference digit-by-digit binary conversion (original algorithm)."""
+    if number == 0:
+        return "0"
+    if number > 0:
+        binary = ""
+        n = number
+        while n > 0:
+            binary = str(n % 2) + binary
+            n //= 2
+        return binary
+    # Representación en complemento a dos
+    bits = max(8, (abs(number).bit_length() + 1))
+    binary = bin((1 << bits) + number)[2:]  # Complemento a dos
+    return binary
+
+
+def reference_to_hexadecimal(number):
+    """Reference digit-by-digit hexadecimal conversion (original algorithm)."""
+    if number == 0:
+        return "0"
+    if number > 0:
+        hex_chars = "0123456789ABCDEF"
+        hexadecimal = ""
+        n = number
+        while n > 0:
+            remainder = n % 16
+            hexadecimal = hex_chars[remainder] + hexadecimal
+            n //= 16
+        return hexadecimal
+    # Representación hexadecimal de complemento a dos
+    bits = max(8, (abs(number).bit_length() + 1))
+    hex_value = hex((1 << bits) + number)[2:].upper()
+    return hex_value
+
+
+def property_cases(samples=10000, seed=0):
+    """Edge cases (0, ±1, powers of two and their neighbours, the
+    8/16/32/64-bit limits) plus ``samples`` random integers of random bit
+    length."""
+    rng = random.Random(seed)
+    cases = [0, 1, -1, 127, -128, 128, -129, 255, -256]
+    for bits in range(1, 130):
+        for base in (1 << bits, (1 << bits) - 1, (1 << bits) + 1):
+            cases.extend((base, -base))
+    cases.extend(rng.choice((1, -1)) * rng.getrandbits(rng.randint(1, 256))
+                 for _ in range(samples))
+    return cases
+
+
+class TestConversions(unittest.TestCase):
+    """The builtin-formatting conversions must match the original ones."""
+
+    def test_binary_matches_reference(self):
+        """convert_to_binary == reference_to_binary."""
+        for number in property_cases():
+            self.assertEqual(convert_to_binary(number),
+                             reference_to_binary(number), number)
+
+    def test_hexadecimal_matches_reference(self):
+        """convert_to_hexadecimal == reference_to_hexadecimal."""
+        for number in property_cases():
+            self.assertEqual(convert_to_hexadecimal(number),
+                             reference_to_hexadecimal(number), number)
+
+
+class TestFixedWidth(unittest.TestCase):
+    """convert_batch with --width: two's complement or OVERFLOW."""
+
+    def test_limits_and_overflow(self):
+        """The signed limits convert; one past them is OVERFLOW."""
+        binaries, hexes = convert_batch([127, -128, 128, -129, 200], 8)
+        self.assertEqual(binaries[:2], ["01111111", "10000000"])
+        self.assertEqual(hexes[:2], ["7F", "80"])
+        self.assertEqual(binaries[2:], [OVERFLOW] * 3)
+        self.assertEqual(hexes[2:], [OVERFLOW] * 3)
+
+    def test_beyond_64_bits(self):
+        """2**63 is not confused with -2**63."""
+        binaries, _ = convert_batch([2 ** 63, -2 ** 63, 2 ** 200], 64)
+        self.assertEqual(binaries,
+                         [OVERFLOW, "1" + "0" * 63, OVERFLOW])
+
+    def test_numpy_matches_python(self):
+        """The vectorized path gives the same columns as the fallback."""
+        if convert_numbers.np is None:
+            self.skipTest("NumPy no está instalado")
+        numbers = property_cases(samples=2000)
+        for width in convert_numbers.WIDTHS:
+            vectorized = convert_batch(numbers, width)
+            with mock.patch.object(convert_numbers, "np", None):
+                self.assertEqual(convert_batch(numbers, width), vectorized)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,42 +1,511 @@
 """Este módulo cuenta las palabras en un archivo de texto."""
+import heapq
+import importlib.util
+import mmap
+import os
+import sqlite3
 import sys
 import time
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
-def read_words_from_file(filename):
-    """Reads words from a file, handling invalid data."""
-    words = {}
+def _import_numeric_ingest():
+    """Load the shared ../numeric_ingest.py once, without touching sys.path.
+
+    The scripts run standalone from P1/P2/P3, so the module is loaded by
+    file path and registered in sys.modules (workers that unpickle
+    ``numeric_ingest.*`` functions find it there).
+    """
+    module = sys.modules.get("numeric_ingest")
+    if module is None:
+        path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "numeric_ingest.py")
+        spec = importlib.util.spec_from_file_location("numeric_ingest", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["numeric_ingest"] = module
+        spec.loader.exec_module(module)
+    return module
+
+numeric_ingest = _import_numeric_ingest()
+
+PUNCTUATION = '.,!?()[]{}"\''
+INDEX_BLOCK_SIZE = 8 * 1024 * 1024  # Bytes read per block when indexing.
+INDEX_MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the index SQLite may mmap.
+
+def tokenize_reference(text):
+    """Original tokenizer (lower and strip per word); kept for benchmarks."""
+    for word in text.strip().split():
+        word = word.lower().strip(PUNCTUATION)
+        if word:
+            yield word
+
+def tokenize_default(text):
+    """Default profile: same tokens as the original tokenizer, but the text
+    is lowercased once instead of once per word (whitespace is never
+    changed by lower(), so the split is the same)."""
+    for word in text.lower().split():
+        word = word.strip(PUNCTUATION)
+        if word:
+            yield word
+
+@lru_cache(maxsize=None)
+def unicode_tables():
+    """Unicode punctuation (categories P*, e.g. ¿ ¡ « ») to strip at word
+    edges, and a str.translate table that turns dashes used between words
+    (— – etc., but not the hyphens - and ‐) into spaces."""
+    punctuation = "".join(chr(code) for code in range(sys.maxunicode + 1)
+                          if unicodedata.category(chr(code)).startswith("P"))
+    separators = {ord(char): " " for char in punctuation
+                  if unicodedata.category(char) == "Pd"
+                  and char not in "-\u2010"}
+    return punctuation, str.maketrans(separators)
+
+def tokenize_unicode(text):
+    """Unicode profile: NFC normalization (composed accents), case folding,
+    dashes between words as separators and stripping of any Unicode
+    punctuation at the word edges, so "¿Qué?" and "QUÉ" both count as
+    "qué"."""
+    punctuation, separators = unicode_tables()
+    text = unicodedata.normalize("NFC", text).casefold().translate(separators)
+    for word in text.split():
+        word = word.strip(punctuation)
+        if word:
+            yield word
+
+TOKENIZERS = {
+    "default": tokenize_default,
+    "unicode": tokenize_unicode,
+    "reference": tokenize_reference,
+}
+
+def iter_words(filename, tokenizer="default"):
+    """Yields the normalized words of a file one at a time."""
+    tokenize = TOKENIZERS[tokenizer]
     try:
         with open(filename, 'r', encoding='utf-8') as file:
             for line in file:
-                for word in line.strip().split():
-                    word = word.lower().strip('.,!?()[]{}"\'')
-                    if word:
-                        words[word] = words.get(word, 0) + 1
+                yield from tokenize(line)
     except FileNotFoundError:
         print(f"Error: El archivo '{filename}' no existe.")
         sys.exit(1)
+
+def read_words_from_file(filename, tokenizer="default"):
+    """Reads words from a file, handling invalid data."""
+    words = {}
+    for word in iter_words(filename, tokenizer):
+        words[word] = words.get(word, 0) + 1
     return words
 
-def main():
-    """Main function that executes the program."""
-    if len(sys.argv) != 2:
-        print("Uso: python word_count.py fileWithData.txt")
+def top_k(words, k):
+    """Returns the k most frequent (word, count) pairs using a heap.
+
+    Ties are broken alphabetically so the result is deterministic."""
+    return heapq.nsmallest(k, words.items(), key=lambda item: (-item[1], item[0]))
+
+class SpaceSaving:
+    """Space-Saving heavy hitters with a fixed number of counters.
+
+    Memory stays at ``capacity`` counters whatever the vocabulary size.
+    Error bounds, for a stream of ``total`` words:
+
+    - every stored count overestimates the true frequency by at most its
+      own ``error`` (true count is in ``[count - error, count]``);
+    - every ``error`` is at most ``total / capacity``;
+    - every word with true frequency above ``total / capacity`` is stored.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.total = 0
+        self.counters = {}  # word -> [count, error]
+        self._heap = []  # (count, word), with stale entries skipped lazily
+
+    def add(self, word):
+        """Counts one occurrence of a word."""
+        self.total += 1
+        counter = self.counters.get(word)
+        if counter is not None:
+            counter[0] += 1
+            heapq.heappush(self._heap, (counter[0], word))
+        elif len(self.counters) < self.capacity:
+            self.counters[word] = [1, 0]
+            heapq.heappush(self._heap, (1, word))
+        else:
+            minimum, evicted = self._pop_minimum()
+            del self.counters[evicted]
+            self.counters[word] = [minimum + 1, minimum]
+            heapq.heappush(self._heap, (minimum + 1, word))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, name)
+                          for name, (count, _) in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_minimum(self):
+        """Pops the current smallest counter, skipping stale heap entries."""
+        while True:
+            count, word = heapq.heappop(self._heap)
+            counter = self.counters.get(word)
+            if counter is not None and counter[0] == count:
+                return count, word
+
+    def error_bound(self):
+        """Maximum overestimation of any count: total / capacity."""
+        return self.total / self.capacity
+
+    def items(self):
+        """(word, count, error) triples, most frequent first."""
+        return sorted(((word, count, error)
+                       for word, (count, error) in self.counters.items()),
+                      key=lambda item: (-item[1], item[0]))
+
+def count_chunk(filename, start, end, tokenizer="default"):
+    """Counts the words of one line-aligned byte range (map step)."""
+    with open(filename, 'rb') as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text = data[start:end].decode('utf-8')
+    return Counter(TOKENIZERS[tokenizer](text))
+
+def count_words_parallel(filename, workers=None,
+                         chunk_size=numeric_ingest.CHUNK_SIZE,
+                         tokenizer="default"):
+    """Map-reduce word count: chunks are counted in a process pool and the
+    partial Counters are merged. Same tokens and normalization as
+    read_words_from_file (splitting the whole chunk on whitespace is
+    equivalent to splitting it line by line)."""
+    try:
+        ranges = numeric_ingest.chunk_ranges(filename, chunk_size)
+    except FileNotFoundError:
+        print(f"Error: El archivo '{filename}' no existe.")
         sys.exit(1)
-    filename = sys.argv[1]
-    start_time = time.time()
-    words = read_words_from_file(filename)
+    words = Counter()
+    if len(ranges) <= 1 or workers == 1:
+        for start, end in ranges:
+            words.update(count_chunk(filename, start, end, tokenizer))
+        return dict(words)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(count_chunk, [filename] * len(ranges),
+                                    [start for start, _ in ranges],
+                                    [end for _, end in ranges],
+                                    [tokenizer] * len(ranges)):
+            words.update(partial)
+    return dict(words)
+
+class WordIndex:
+    """Persistent on-disk word index (SQLite, memory-mapped reads).
+
+    Stores word -> count and, optionally, word -> (file, line) postings in
+    WITHOUT ROWID tables keyed by word, so point and prefix queries are
+    B-tree lookups that never touch the source text. Each indexed file
+    remembers how far it was read, so ``update`` only tokenizes appended
+    text. A last line without newline is counted but re-read on the next
+    update, in case the appended text continues it.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS sources (
+            id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,
+            offset INTEGER NOT NULL, size INTEGER NOT NULL,
+            line INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS words (
+            word TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS postings (
+            word TEXT, source INTEGER, line INTEGER,
+            PRIMARY KEY (word, source, line)) WITHOUT ROWID;
+    """
+
+    def __init__(self, path, postings=None, tokenizer=None):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(f"PRAGMA mmap_size = {INDEX_MMAP_SIZE}")
+        self.connection.executescript(self.SCHEMA)
+        meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+        if not meta:
+            meta = {"tokenizer": tokenizer or "default",
+                    "postings": "1" if postings else "0"}
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO meta VALUES (?, ?)", meta.items())
+        if tokenizer not in (None, meta["tokenizer"]) or \
+                postings not in (None, meta["postings"] == "1"):
+            self.connection.close()
+            raise ValueError(
+                f"El índice {path} se creó con tokenizer="
+                f"{meta['tokenizer']} y postings={meta['postings'] == '1'}")
+        self.tokenizer = meta["tokenizer"]
+        self.with_postings = meta["postings"] == "1"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the index."""
+        self.connection.close()
+
+    def _apply(self, source, numbered_lines, sign):
+        """Adds (sign=1) or removes (sign=-1) the words of some lines."""
+        tokenize = TOKENIZERS[self.tokenizer]
+        counts = Counter()
+        postings = set()
+        for line_num, raw in numbered_lines:
+            for word in tokenize(raw.decode('utf-8')):
+                counts[word] += 1
+                if self.with_postings:
+                    postings.add((word, source, line_num))
+        self.connection.executemany(
+            "INSERT INTO words VALUES (?, ?) ON CONFLICT(word) "
+            "DO UPDATE SET count = count + excluded.count",
+            ((word, sign * count) for word, count in counts.items()))
+        if sign > 0:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO postings VALUES (?, ?, ?)", postings)
+        else:
+            self.connection.execute("DELETE FROM words WHERE count <= 0")
+            self.connection.executemany(
+                "DELETE FROM postings WHERE source = ? AND line = ?",
+                ((source, line_num) for line_num, _ in numbered_lines))
+
+    def update(self, filename):
+        """Indexes the text appended to ``filename`` since the last update.
+
+        Returns the number of bytes read. Raises ValueError if the file
+        shrank (it was rewritten, not appended to)."""
+        path = os.path.abspath(filename)
+        new_size = os.path.getsize(path)
+        with self.connection:
+            row = self.connection.execute(
+                "SELECT id, offset, size, line FROM sources WHERE path = ?",
+                (path,)).fetchone()
+            if row is None:
+                row = (self.connection.execute(
+                    "INSERT INTO sources (path, offset, size, line) "
+                    "VALUES (?, 0, 0, 1)", (path,)).lastrowid, 0, 0, 1)
+            source, offset, size, line_num = row
+            if new_size < size:
+                raise ValueError(f"El archivo {path} es más corto que la "
+                                 "versión indexada; reconstruya el índice")
+            if new_size == size:
+                return 0
+            with open(path, 'rb') as file:
+                file.seek(offset)
+                if size > offset:
+                    # La última línea sin salto ya se contó: se descuenta y
+                    # se vuelve a leer completa.
+                    self._apply(source, [(line_num, file.read(size - offset))],
+                                -1)
+                    file.seek(offset)
+                pending = b""
+                remaining = new_size - offset
+                while remaining:
+                    block = file.read(min(INDEX_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    pending += block
+                    cut = pending.rfind(b"\n") + 1
+                    if not cut:
+                        continue
+                    lines = pending[:cut].split(b"\n")[:-1]
+                    self._apply(source, list(enumerate(lines, line_num)), 1)
+                    offset += cut
+                    line_num += len(lines)
+                    pending = pending[cut:]
+                if pending:
+                    self._apply(source, [(line_num, pending)], 1)
+            self.connection.execute(
+                "UPDATE sources SET offset = ?, size = ?, line = ? "
+                "WHERE id = ?", (offset, new_size, line_num, source))
+        return new_size - row[2]
+
+    def normalize(self, word):
+        """Normalizes a query word with the index's tokenizer."""
+        tokens = list(TOKENIZERS[self.tokenizer](word))
+        return tokens[0] if tokens else ""
+
+    def count(self, word):
+        """Point query: frequency of one word (0 if absent)."""
+        row = self.connection.execute(
+            "SELECT count FROM words WHERE word = ?",
+            (self.normalize(word),)).fetchone()
+        return row[0] if row else 0
+
+    def prefix(self, prefix, limit=None):
+        """Prefix query: (word, count) pairs in alphabetical order."""
+        prefix = self.normalize(prefix) if prefix else ""
+        return self.connection.execute(
+            "SELECT word, count FROM words WHERE word >= ? AND word < ? "
+            "ORDER BY word LIMIT ?",
+            (prefix, prefix + "\U0010ffff", -1 if limit is None else limit)
+        ).fetchall()
+
+    def postings(self, word):
+        """(file, line) pairs where the word appears (postings indexes)."""
+        return self.connection.execute(
+            "SELECT sources.path, postings.line FROM postings "
+            "JOIN sources ON sources.id = postings.source "
+            "WHERE postings.word = ? ORDER BY sources.path, postings.line",
+            (self.normalize(word),)).fetchall()
+
+def main_index(index_path, args, options, tokenizer):
+    """--index mode: update the index with files, or query it."""
+    try:
+        index = WordIndex(index_path,
+                          postings=True if "--postings" in options else None,
+                          tokenizer=tokenizer)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    with index:
+        if "--query" in options:
+            for word in args:
+                print(f"{word}: {index.count(word)}")
+                if index.with_postings:
+                    for path, line in index.postings(word):
+                        print(f"    {path}:{line}")
+        elif "--prefix" in options:
+            for prefix in args:
+                for word, count in index.prefix(prefix):
+                    print(f"{word}: {count}")
+        else:
+            for filename in args:
+                try:
+                    read = index.update(filename)
+                except FileNotFoundError:
+                    print(f"Error: El archivo '{filename}' no existe.")
+                    sys.exit(1)
+                except ValueError as e:
+                    print(f"Error: {e}")
+                    sys.exit(1)
+                print(f"{filename}: {read} bytes nuevos indexados")
+
+def benchmark_tokenizers(filename, repeat=3):
+    """Best-of-``repeat`` seconds to count the file with each tokenizer."""
+    timings = {}
+    for name in TOKENIZERS:
+        if name == "unicode":
+            unicode_tables()  # Las tablas se construyen una sola vez.
+        best = None
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            read_words_from_file(filename, name)
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    return timings
+
+def approx_report(filename, values, tokenizer):
+    """Title and lines of the approximate (Space-Saving) count."""
+    sketch = SpaceSaving(values["--approx"])
+    for word in iter_words(filename, tokenizer):
+        sketch.add(word)
+    if not sketch.total:
+        print("No hay palabras válidas para procesar.")
+        sys.exit(1)
+    items = sketch.items()
+    rows = items[:values.get("--top")]
+    output = "\n".join(f"{word}: {count} (error <= {error})"
+                       for word, count, error in rows)
+    if len(rows) < len(items):
+        listed = f"only the top {len(rows)} counts are listed."
+    else:
+        listed = "every word more frequent than that is listed."
+    title = (f"Approximate Word Frequency Count (Space-Saving, "
+             f"{sketch.capacity} counters, {sketch.total} words):\n"
+             f"Each count overestimates the true one by at most its "
+             f"error; every error <= {sketch.error_bound():.2f} and "
+             f"{listed}")
+    return title, output
+
+def exact_report(filename, values, tokenizer, parallel):
+    """Title and lines of the exact count (all words or the top K)."""
+    if parallel:
+        words = count_words_parallel(filename, tokenizer=tokenizer)
+    else:
+        words = read_words_from_file(filename, tokenizer)
     if not words:
         print("No hay palabras válidas para procesar.")
         sys.exit(1)
-    output = "\n".join(f"{word}: {count}" for word, count in sorted(words.items()))
+    if "--top" in values:
+        pairs = top_k(words, values["--top"])
+        title = f"Top {values['--top']} Word Frequency Count:"
+    else:
+        pairs = sorted(words.items())
+        title = "Word Frequency Count:"
+    return title, "\n".join(f"{word}: {count}" for word, count in pairs)
+
+def parse_count_options(options):
+    """Splits --top=K/--approx=M off ``options``; None if they are invalid.
+
+    Returns the {option: value} dict; ``options`` keeps the flags."""
+    values = {}
+    for option in [opt for opt in options if "=" in opt]:
+        name, _, value = option.partition("=")
+        if not value.isdigit() or int(value) <= 0:
+            return None
+        values[name] = int(value)
+        options.discard(option)
+    if not options <= {"--parallel"} \
+            or not values.keys() <= {"--top", "--approx"} \
+            or ("--approx" in values and options):
+        return None
+    return values
+
+def main_count(filename, values, options, tokenizer):
+    """Counts the words of one file and writes the report."""
+    start_time = time.time()
+    if "--approx" in values:
+        title, output = approx_report(filename, values, tokenizer)
+    else:
+        title, output = exact_report(filename, values, tokenizer,
+                                     "--parallel" in options)
     end_time = time.time()
     elapsed_time = end_time - start_time
     result_output = (
-        f"Word Frequency Count:\n{output}\n\n"
+        f"{title}\n{output}\n\n"
         f"Execution Time: {elapsed_time:.6f} seconds\n"
     )
     print(result_output)
     with open("WordCountResults.txt", "w", encoding='utf-8') as result_file:
         result_file.write(result_output)
+
+def main():
+    """Main function that executes the program."""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    tokenizer = "default"
+    for option in [opt for opt in options if opt.startswith("--tokenizer=")]:
+        tokenizer = option.partition("=")[2]
+        options.discard(option)
+    if options == {"--benchmark"} and len(args) == 1:
+        for name, seconds in benchmark_tokenizers(args[0]).items():
+            print(f"{name}: {seconds:.6f} seconds")
+        return
+    index_options = {opt for opt in options if opt.startswith("--index=")}
+    if len(index_options) == 1 and args and \
+            options - index_options <= {"--postings", "--query", "--prefix"} \
+            and tokenizer in TOKENIZERS:
+        main_index(index_options.pop()[8:], args, options,
+                   None if tokenizer == "default" else tokenizer)
+        return
+    values = parse_count_options(options)
+    if len(args) != 1 or values is None or tokenizer not in TOKENIZERS:
+        print("Uso: python word_count.py fileWithData.txt [--parallel] "
+              "[--top=K] [--tokenizer=default|unicode]\n"
+              "     python word_count.py fileWithData.txt --approx=M [--top=K]"
+              " [--tokenizer=default|unicode]\n"
+              "     python word_count.py fileWithData.txt --benchmark\n"
+              "     python word_count.py --index=words.db file1.txt ... "
+              "[--postings] [--tokenizer=default|unicode]\n"
+              "     python word_count.py --index=words.db --query word ...\n"
+              "     python word_count.py --index=words.db --prefix prefix")
+        sys.exit(1)
+    main_count(args[0], values, options, tokenizer)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,86 @@
+"""Shared parallel ingestion of numeric input files (one value per line).
+
+The file is memory-mapped, split into newline-aligned chunks and each chunk
+is parsed in a worker process. Used by P1/computeStatistics.py and
+P2/convert_numbers.py; P3/word_count.py reuses chunk_ranges for its
+map-reduce mode.
+"""
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_SIZE = 8 * 1024 * 1024  # Bytes per chunk handed to a worker.
+
+
+def chunk_ranges(filename, chunk_size=CHUNK_SIZE):
+    """Return (start, end) byte ranges that always end after a newline."""
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+    ranges = []
+    with open(filename, 'rb') as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                newline = data.find(b"\n", end - 1)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(filename, start, end, parser):
+    """Parse the lines of one byte range of the file.
+
+    Returns the parsed numbers, the invalid lines as (local line index,
+    stripped text) pairs and the number of lines in the chunk.
+    """
+    with open(filename, 'rb') as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        lines = data[start:end].decode('utf-8').split("\n")
+    if lines[-1] == "":
+        lines.pop()  # Chunk ends with a newline: no extra line.
+    numbers = []
+    invalid = []
+    for index, line in enumerate(lines):
+        line = line.strip()
+        try:
+            numbers.append(parser(line))
+        except ValueError:
+            invalid.append((index, line))
+    return numbers, invalid, len(lines)
+
+
+def parse_file(filename, parser=float, workers=None, chunk_size=CHUNK_SIZE):
+    """Parse a numeric file in parallel.
+
+    ``parser`` converts one stripped line (``float`` or ``int``) and must
+    raise ValueError on invalid data; empty lines are reported as invalid
+    with an empty text. Returns the numbers in file order and the invalid
+    lines as (line number, text) pairs with global 1-based line numbers.
+    """
+    ranges = chunk_ranges(filename, chunk_size)
+    if len(ranges) <= 1 or workers == 1:
+        results = [parse_chunk(filename, start, end, parser)
+                   for start, end in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                parse_chunk,
+                [filename] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [parser] * len(ranges),
+            ))
+
+    numbers = []
+    invalid = []
+    first_line = 1
+    for chunk_numbers, chunk_invalid, line_count in results:
+        numbers.extend(chunk_numbers)
+        invalid.extend((first_line + index, text)
+                       for index, text in chunk_invalid)
+        first_line += line_count
+    return numbers, invalid
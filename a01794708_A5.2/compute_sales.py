@@ -5,10 +5,30 @@ using a price catalogue JSON file.
 It handles errors gracefully and outputs the results
 to both the console and a file.
 """
+import hashlib
 import json
+import os
 import sys
 import time
 import csv
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Context, Decimal, localcontext
+
+OPTIONS = {
+    "--stream", "--jsonl", "--parallel", "--quiet", "--incremental"
+}
+SHARD_SIZE = 50000
+# Precisión amplia para que las sumas en Decimal sean exactas y el
+# resultado no dependa del orden en que se combinan los fragmentos.
+DECIMAL_CONTEXT = Context(prec=60)
+_shard_prices = {}
+CHECKPOINT_FILE = "SalesResults.checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointMismatch(Exception):
+    """El archivo de ventas ya no coincide con el checkpoint guardado."""
 
 
 def load_json_file(file_path):
@@ -25,117 +45,665 @@ def load_json_file(file_path):
     return None
 
 
-def compute_total_sales(prices, sales):
+def _read_chunk(file, buffer, chunk_size):
+    """Agrega un bloque al buffer; regresa (buffer, fin_de_archivo)."""
+    chunk = file.read(chunk_size)
+    return buffer + chunk, not chunk
+
+
+def _skip_whitespace(buffer, pos):
+    """Avanza la posición sobre espacios en blanco."""
+    while pos < len(buffer) and buffer[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def _decode_item(decoder, buffer, pos, eof):
+    """Decodifica el valor en ``pos``; regresa None si falta leer más."""
+    try:
+        item, end = decoder.raw_decode(buffer, pos)
+    except json.JSONDecodeError:
+        if eof:
+            raise
+        return None
+    follow = _skip_whitespace(buffer, end)
+    if not eof and (follow == len(buffer) or buffer[follow] not in ",]"):
+        # Sin el separador siguiente el valor podría continuar en el
+        # próximo bloque (p. ej. un número cortado).
+        return None
+    return item, end
+
+
+def _iter_array_items(file, chunk_size):
+    """Decodifica los elementos de un arreglo JSON leído por bloques."""
+    decoder = json.JSONDecoder()
+    buffer, eof = "", False
+    pos = 0
+    started = False
+    expecting_item = True
+    while True:
+        pos = _skip_whitespace(buffer, pos)
+        if pos == len(buffer):
+            if eof:
+                raise json.JSONDecodeError("Arreglo sin cerrar", buffer, pos)
+            buffer, eof = _read_chunk(file, buffer[pos:], chunk_size)
+            pos = 0
+            continue
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise json.JSONDecodeError("Se esperaba '['", buffer, pos)
+            started = True
+            pos += 1
+        elif char == "]":
+            return
+        elif char == "," and not expecting_item:
+            expecting_item = True
+            pos += 1
+        elif not expecting_item:
+            raise json.JSONDecodeError("Se esperaba ',' o ']'", buffer, pos)
+        else:
+            decoded = _decode_item(decoder, buffer, pos, eof)
+            if decoded is None:
+                buffer, eof = _read_chunk(file, buffer[pos:], chunk_size)
+                pos = 0
+                continue
+            item, pos = decoded
+            yield item
+            expecting_item = False
+            if pos >= chunk_size:
+                buffer, pos = buffer[pos:], 0
+
+
+def iter_json_array(file_path, chunk_size=65536):
+    """Lee un arreglo JSON elemento por elemento sin cargarlo completo.
+
+    La memoria queda acotada por el tamaño del bloque y del elemento más
+    grande, de modo que las ventas se procesan conforme se lee el archivo.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            yield from _iter_array_items(file, chunk_size)
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {file_path}")
+    except json.JSONDecodeError as e:
+        print(
+            f"Error: El archivo {file_path} no tiene un formato JSON válido"
+            f" ({e.msg})"
+        )
+    except OSError as e:
+        print(f"Error de sistema al leer {file_path}: {e}")
+
+
+def iter_json_lines(file_path):
+    """Lee un archivo JSON Lines (un objeto por línea) como generador."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            for line_num, line in enumerate(file, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(
+                        f"Error: Línea {line_num} de {file_path} "
+                        "no tiene un formato JSON válido"
+                    )
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {file_path}")
+    except OSError as e:
+        print(f"Error de sistema al leer {file_path}: {e}")
+
+
+def load_sales(file_path, options):
+    """Selecciona el lector de ventas según las opciones de línea de
+    comandos: JSON Lines, arreglo JSON en streaming o carga completa."""
+    if "--jsonl" in options or file_path.endswith(".jsonl"):
+        return iter_json_lines(file_path)
+    if "--stream" in options:
+        return iter_json_array(file_path)
+    return load_json_file(file_path)
+
+
+def build_price_index(prices):
+    """Construye un índice producto -> precio a partir del catálogo.
+
+    Se recorre el catálogo una sola vez; los títulos repetidos se
+    conservan con su primer precio y se reportan en lugar de sumarse
+    varias veces en cada venta.
+    """
+    index = {}
+    duplicates = []
+    for item in prices:
+        product = item.get("Product")
+        if product in index:
+            duplicates.append(
+                f"Producto duplicado en el catálogo: {product} "
+                f"(se usa el precio {index[product]:.2f}, "
+                f"se ignora {item['price']:.2f})"
+            )
+            continue
+        index[product] = item["price"]
+    return index, duplicates
+
+
+class SalesReportWriter:
+    """Escribe el reporte de ventas en un solo paso.
+
+    Cada venta valorada se emite como registro tipado directamente al CSV,
+    al reporte de texto y, opcionalmente, a la consola, sin guardar las
+    filas en memoria ni volver a separar cadenas ya formateadas.
+    """
+
+    HEADER = ("Producto", "Cantidad", "Precio Unidad", "Costo Total")
+
+    def __init__(self, text_path, csv_path=None, echo=True,
+                 buffer_size=1 << 16):
+        self.text_path = text_path
+        self.csv_path = csv_path
+        self.echo = echo
+        self.buffer_size = buffer_size
+        self._text_file = None
+        self._csv_file = None
+        self._csv_writer = None
+
+    def __enter__(self):
+        self._text_file = open(  # pylint: disable=consider-using-with
+            self.text_path, "w", encoding="utf-8",
+            buffering=self.buffer_size
+        )
+        if self.csv_path:
+            self._csv_file = open(  # pylint: disable=consider-using-with
+                self.csv_path, "w", newline="", encoding="utf-8",
+                buffering=self.buffer_size
+            )
+            self._csv_writer = csv.writer(self._csv_file)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._text_file.close()
+        if self._csv_file:
+            self._csv_file.close()
+
+    def write_line(self, line):
+        """Escribe una línea del reporte de texto (y de la consola)."""
+        self._text_file.write(line + "\n")
+        if self.echo:
+            print(line)
+
+    def write_header(self):
+        """Escribe los encabezados de la tabla de ventas."""
+        self.write_line(
+            f"{self.HEADER[0]:<32} "
+            f"{self.HEADER[1]:<12} "
+            f"{self.HEADER[2]:<18} "
+            f"{self.HEADER[3]:<18}"
+        )
+        self.write_line("-" * 85)
+        if self._csv_writer:
+            self._csv_writer.writerow(self.HEADER)
+
+    def write_record(self, product, quantity, price, total):
+        """Escribe una venta valorada en todos los destinos."""
+        self.write_line(
+            f"{product:<35}{quantity:<12}{price:<18.2f}{total:<18.2f}"
+        )
+        if self._csv_writer:
+            self._csv_writer.writerow(
+                (product, quantity, f"{price:.2f}", f"{total:.2f}")
+            )
+
+    def write_summary(self, result_text):
+        """Escribe el resumen final (total, tiempo, errores y alertas)."""
+        self._text_file.write(result_text)
+        print(result_text)
+
+
+def compute_total_sales(price_index, sales, writer):
     """Calcula el costo total de las ventas basado en los precios
-      y guarda en un archivo txt"""
+      y emite cada venta al ``writer`` conforme se valora"""
     total_cost = 0
     errors = []
     alert = []
-
-    output = []  # Lista para almacenar todos los mensajes de salida
-    output.append(
-        f"{'Producto':<32} "
-        f"{'Cantidad':<12} "
-        f"{'Precio Unidad':<18} "
-        f"{'Costo Total':<18}"
-    )
-    output.append("-" * 85)
+    writer.write_header()
     for sale in sales:
-        if not any(
-            price["Product"] == sale.get("Product") for price in prices
-        ):
+        if sale.get("Product") not in price_index:
             errors.append(
                 "Producto no encontrado en el catálogo: "
                 + sale.get("Product")
                 )
-        result = process_sale(prices, sale, total_cost)
+        result = process_sale(price_index, sale, total_cost)
         if result:
-            total_cost, rows, alert_msg = result
-            output.extend(rows)
+            total_cost, record, alert_msg = result
+            writer.write_record(*record)
             alert.extend(alert_msg)
-    write_to_csv(output)
-    # Al final, imprimimos todo el contenido almacenado en 'output'
-    output.append("-" * 85)
-    # Guardar el contenido en un archivo de texto
-    return total_cost, errors, alert, output
+    writer.write_line("-" * 85)
+    return total_cost, errors, alert
 
 
-def process_sale(prices, sale, total_cost):
+def process_sale(price_index, sale, total_cost):
     """Realiza el calculo del costo total """
     product = sale.get("Product")
     quantity = sale.get("Quantity")
-    rows = []
     alert_msg = []
-    if not any(price["Product"] == product for price in prices):
+    price = price_index.get(product)
+    if price is None:
         return None
     if not isinstance(quantity, (int, float)) or quantity < 0:
         alert_msg.append(
             f"Cantidad negativa para el producto {product}: {quantity}"
             ",se va a restar del total"
             )
-    for item in prices:
-        if item["Product"] == product:
-            if quantity < 0:  # Si la cantidad es negativa, restamos
-                total_cost -= item["price"] * abs(quantity)
-            else:  # Si es positiva, sumamos
-                total_cost += item["price"] * quantity
-            product_str = f"{product:<35}"
-            quantity_str = f"{quantity:<12}"
-            price_str = f"{item['price']:<18.2f}"
-            total_item_str = f"{item['price'] * quantity:<18.2f}"
-            rows.append(
-                product_str + quantity_str + price_str + total_item_str
-            )
-    return total_cost, rows, alert_msg
+    if quantity < 0:  # Si la cantidad es negativa, restamos
+        total_cost -= price * abs(quantity)
+    else:  # Si es positiva, sumamos
+        total_cost += price * quantity
+    return total_cost, (product, quantity, price, price * quantity), alert_msg
+
+
+def _init_shard_worker(price_index):
+    """Guarda el catálogo (solo lectura) en cada proceso del pool."""
+    _shard_prices.clear()
+    _shard_prices.update(
+        (product, Decimal(str(price)))
+        for product, price in price_index.items()
+    )
+
+
+def _new_rollup():
+    """Crea acumuladores vacíos para un fragmento de ventas."""
+    return {
+        "total": Decimal(0),
+        "by_sale_id": {},
+        "by_date": {},
+        "by_product": {},
+        "errors": [],
+        "alerts": [],
+    }
 
 
-def write_to_csv(rows_to_write):
-    "guarda el producto,cantidad y precio en un csv"
-    with open(
-        "ProductList.csv", mode="w", newline="", encoding='utf-8'
-    ) as file:
-        writer = csv.writer(file)
-        for index, data_string in enumerate(rows_to_write):
-            if index == 1:
+def _add_to(totals, key, amount):
+    """Suma un importe al acumulador de la llave indicada."""
+    totals[key] = totals.get(key, Decimal(0)) + amount
+
+
+def _price_shard(shard):
+    """Valora un fragmento de ventas y regresa sus sumas parciales."""
+    rollup = _new_rollup()
+    with localcontext(DECIMAL_CONTEXT):
+        for sale in shard:
+            product = sale.get("Product")
+            quantity = sale.get("Quantity")
+            price = _shard_prices.get(product)
+            if price is None:
+                rollup["errors"].append(
+                    f"Producto no encontrado en el catálogo: {product}"
+                )
+                continue
+            if not isinstance(quantity, (int, float)):
+                rollup["errors"].append(
+                    f"Cantidad inválida para el producto {product}: "
+                    f"{quantity}"
+                )
                 continue
-            data = data_string.split()
-            writer.writerow(data)
+            if quantity < 0:
+                rollup["alerts"].append(
+                    f"Cantidad negativa para el producto {product}: "
+                    f"{quantity},se va a restar del total"
+                )
+            amount = price * Decimal(str(quantity))
+            rollup["total"] += amount
+            _add_to(rollup["by_sale_id"], sale.get("SALE_ID"), amount)
+            _add_to(rollup["by_date"], sale.get("SALE_Date"), amount)
+            _add_to(rollup["by_product"], product, amount)
+    return rollup
 
 
-def main():
-    """Función principal para ejecutar el programa."""
-    if len(sys.argv) != 3:
-        print(
-            "Uso: python computeSales.py priceCatalogue.json "
-            "salesRecord.json"
-        )
-        sys.exit(1)
-    price_file = sys.argv[1]
-    sales_file = sys.argv[2]
-    start_time = time.time()
-    price_data = load_json_file(price_file)
-    sales_data = load_json_file(sales_file)
-    for product in price_data:
-        if "title" in product:
-            product["Product"] = product.pop("title")
-    result = compute_total_sales(price_data, sales_data)
-    total_sales, error_list, alert_list, output = result
-    for line in output:
-        print(line)
+def _merge_rollup(result, partial):
+    """Combina las sumas parciales de un fragmento en el resultado."""
+    with localcontext(DECIMAL_CONTEXT):
+        result["total"] += partial["total"]
+        for key in ("by_sale_id", "by_date", "by_product"):
+            for name, amount in partial[key].items():
+                _add_to(result[key], name, amount)
+    result["errors"].extend(partial["errors"])
+    result["alerts"].extend(partial["alerts"])
+
+
+def _iter_shards(sales, shard_size):
+    """Divide las ventas (lista o generador) en fragmentos."""
+    sales = iter(sales)
+    while True:
+        shard = list(itertools.islice(sales, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def aggregate_sales(price_index, sales, workers=None, shard_size=SHARD_SIZE):
+    """Calcula el total de ventas y los totales por venta, fecha y producto.
+
+    Las ventas se dividen en fragmentos que se valoran en un pool de
+    procesos contra el catálogo compartido. Los importes se acumulan en
+    Decimal, por lo que la combinación es exacta y la ejecución en
+    paralelo produce exactamente el mismo resultado que la serial
+    (``workers=1``).
+    """
+    result = _new_rollup()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_shard_worker(price_index)
+        for shard in _iter_shards(sales, shard_size):
+            _merge_rollup(result, _price_shard(shard))
+        return result
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_shard_worker,
+        initargs=(price_index,),
+    ) as executor:
+        pending = []
+        for shard in _iter_shards(sales, shard_size):
+            pending.append(executor.submit(_price_shard, shard))
+            # Se limita el número de fragmentos en vuelo para que la
+            # memoria no crezca con el tamaño del archivo.
+            if len(pending) >= 2 * workers:
+                _merge_rollup(result, pending.pop(0).result())
+        for future in pending:
+            _merge_rollup(result, future.result())
+    return result
+
+
+def format_rollups(result):
+    """Genera las líneas del reporte de totales agrupados."""
+    output = [f"{'Producto':<35}{'Costo Total':<18}", "-" * 85]
+    for product, amount in sorted(result["by_product"].items()):
+        output.append(f"{product:<35}{amount:<18.2f}")
+    output.append("-" * 85)
+    output.append(f"{'Fecha':<35}{'Costo Total':<18}")
+    for date, amount in sorted(result["by_date"].items(), key=_sort_key):
+        output.append(f"{date!s:<35}{amount:<18.2f}")
+    output.append("-" * 85)
+    if not result["by_sale_id"]:
+        return output
+    output.append(f"{'Venta (SALE_ID)':<35}{'Costo Total':<18}")
+    for sale_id, amount in sorted(
+        result["by_sale_id"].items(), key=_sort_key
+    ):
+        output.append(f"{sale_id!s:<35}{amount:<18.2f}")
+    output.append("-" * 85)
+    return output
+
+
+def _sort_key(item):
+    """Ordena llaves de tipos mezclados (p. ej. SALE_ID int o None).
+
+    Las llaves numéricas van primero y por valor (1, 2, 10); las demás
+    después, agrupadas por tipo y en orden de texto.
+    """
+    key = item[0]
+    if isinstance(key, (int, float)) and not isinstance(key, bool):
+        return (0, key, "")
+    return (1, type(key).__name__, str(key))
+
+
+def file_sha256(file_path):
+    """Calcula el hash SHA-256 del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _new_checkpoint(catalogue_hash, sales_file):
+    """Crea el estado inicial (vacío) de un cálculo incremental."""
+    return {
+        "version": CHECKPOINT_VERSION,
+        "catalogue_sha256": catalogue_hash,
+        "sales_file": os.path.abspath(sales_file),
+        "offset": 0,
+        "records": 0,
+        "last_sale_id": None,
+        "total": Decimal(0),
+        "by_product": {},
+        "by_date": {},
+        "errors": [],
+        "alerts": [],
+    }
+
+
+def load_checkpoint(checkpoint_path, catalogue_hash, sales_file):
+    """Carga el checkpoint si sigue siendo válido; si no, uno vacío.
+
+    El checkpoint se invalida cuando cambia el contenido del catálogo de
+    precios (comparando su hash) o cuando corresponde a otro archivo de
+    ventas, para que nunca se mezclen totales obsoletos.
+    """
+    fresh = _new_checkpoint(catalogue_hash, sales_file)
+    try:
+        with open(checkpoint_path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+    except FileNotFoundError:
+        return fresh
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Checkpoint ilegible ({e}); se recalcula todo")
+        return fresh
+    if state.get("version") != CHECKPOINT_VERSION:
+        print("Checkpoint de otra versión; se recalcula todo")
+        return fresh
+    if state.get("catalogue_sha256") != catalogue_hash:
+        print("El catálogo de precios cambió; se recalcula todo")
+        return fresh
+    if state.get("sales_file") != fresh["sales_file"]:
+        print("El checkpoint es de otro archivo de ventas; se recalcula todo")
+        return fresh
+    state["total"] = Decimal(state["total"])
+    for key in ("by_product", "by_date"):
+        state[key] = {name: Decimal(v) for name, v in state[key].items()}
+    return state
+
+
+def save_checkpoint(checkpoint_path, state):
+    """Guarda el checkpoint de forma atómica (archivo temporal + rename)."""
+    data = dict(state)
+    data["total"] = str(state["total"])
+    for key in ("by_product", "by_date"):
+        data[key] = {name: str(v) for name, v in state[key].items()}
+    temp_path = checkpoint_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(temp_path, checkpoint_path)
+
+
+def _iter_new_json_lines(sales_file, state):
+    """Lee las ventas de un JSON Lines a partir del offset en bytes."""
+    try:
+        with open(sales_file, "rb") as file:
+            if os.fstat(file.fileno()).st_size < state["offset"]:
+                raise CheckpointMismatch("el archivo de ventas es más corto")
+            file.seek(state["offset"])
+            yield from _read_new_json_lines(file, state)
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo {sales_file}")
+    except OSError as e:
+        print(f"Error de sistema al leer {sales_file}: {e}")
+
+
+def _read_new_json_lines(file, state):
+    """Decodifica las líneas completas desde la posición actual."""
+    for raw_line in file:
+        if not raw_line.endswith(b"\n"):
+            # Línea final incompleta: se procesará en la siguiente
+            # ejecución cuando termine de escribirse.
+            break
+        state["offset"] += len(raw_line)
+        line = raw_line.decode("utf-8").strip()
+        if not line:
+            continue
+        try:
+            sale = json.loads(line)
+        except json.JSONDecodeError:
+            state["errors"].append(
+                f"Línea con JSON inválido en byte {state['offset']}"
+            )
+            continue
+        state["records"] += 1
+        state["last_sale_id"] = sale.get("SALE_ID")
+        yield sale
+
+
+def _iter_new_array_items(sales_file, state):
+    """Recorre un arreglo JSON omitiendo las ventas ya procesadas.
+
+    Las ventas ya contabilizadas se decodifican pero no se valoran; la
+    última se compara contra ``last_sale_id`` para detectar archivos que
+    fueron reescritos en lugar de extendidos.
+    """
+    seen = 0
+    for sale in iter_json_array(sales_file):
+        seen += 1
+        if seen < state["records"]:
+            continue
+        if seen == state["records"]:
+            if sale.get("SALE_ID") != state["last_sale_id"]:
+                raise CheckpointMismatch("el último SALE_ID no coincide")
+            continue
+        state["records"] = seen
+        state["last_sale_id"] = sale.get("SALE_ID")
+        yield sale
+    if seen < state["records"]:
+        raise CheckpointMismatch("el archivo de ventas es más corto")
+
+
+def _price_new_records(price_index, new_records, state):
+    """Valora las ventas nuevas y las acumula en el checkpoint."""
+    _init_shard_worker(price_index)
+    for shard in _iter_shards(new_records, SHARD_SIZE):
+        partial = _price_shard(shard)
+        with localcontext(DECIMAL_CONTEXT):
+            state["total"] += partial["total"]
+            for key in ("by_product", "by_date"):
+                for name, amount in partial[key].items():
+                    _add_to(state[key], name, amount)
+        state["errors"].extend(partial["errors"])
+        state["alerts"].extend(partial["alerts"])
+
+
+def incremental_sales(price_index, price_file, sales_file, jsonl=False,
+                      checkpoint_path=CHECKPOINT_FILE):
+    """Actualiza los totales valorando solo las ventas nuevas.
+
+    Los totales acumulados, las sumas por producto y por fecha y la
+    posición alcanzada (offset en bytes para JSON Lines, número de ventas
+    y último SALE_ID para arreglos JSON) se guardan en un checkpoint.
+    Regresa el estado actualizado y el número de ventas nuevas.
+    """
+    catalogue_hash = file_sha256(price_file)
+    state = load_checkpoint(checkpoint_path, catalogue_hash, sales_file)
+    reader = _iter_new_json_lines if jsonl else _iter_new_array_items
+    previous = state["records"]
+    try:
+        _price_new_records(price_index, reader(sales_file, state), state)
+    except CheckpointMismatch as e:
+        print(f"Checkpoint descartado ({e}); se recalcula todo")
+        state = _new_checkpoint(catalogue_hash, sales_file)
+        previous = 0
+        _price_new_records(price_index, reader(sales_file, state), state)
+    save_checkpoint(checkpoint_path, state)
+    state["by_sale_id"] = {}
+    return state, state["records"] - previous
 
-    elapsed_time = time.time() - start_time
+
+def _run_incremental(price_index, price_file, sales_file, options, report):
+    """Modo --incremental: valora solo las ventas nuevas."""
+    rollups, new_count = incremental_sales(
+        price_index, price_file, sales_file,
+        jsonl="--jsonl" in options or sales_file.endswith(".jsonl"),
+    )
+    report.write_line(f"Ventas nuevas procesadas: {new_count}")
+    return rollups["total"], rollups["errors"], rollups["alerts"], rollups
+
+
+def _run_parallel(price_index, sales_file, options):
+    """Modo --parallel: agrega las ventas por fragmentos en un pool."""
+    rollups = aggregate_sales(price_index, load_sales(sales_file, options))
+    return rollups["total"], rollups["errors"], rollups["alerts"], rollups
+
+
+def _run_serial(price_index, sales_file, options, report):
+    """Modo por omisión: emite cada venta valorada al reporte."""
+    total_sales, error_list, alert_list = compute_total_sales(
+        price_index, load_sales(sales_file, options), report
+    )
+    return total_sales, error_list, alert_list, None
+
+
+def _format_summary(total_sales, elapsed_time, error_list, alert_list):
+    """Genera el texto del resumen final."""
     result_text = (
         f"Total de ventas calculado: ${total_sales:.2f}\n"
         f"Tiempo de ejecución: {elapsed_time:.4f} segundos\n"
     )
     if error_list:
-        result_text += "Errores encontrados:\n" + "\n".join(error_list) + "\n"
+        result_text += (
+            "Errores encontrados:\n" + "\n".join(error_list) + "\n"
+        )
     if alert_list:
-        result_text += "Alertas encontradas:\n" + "\n".join(alert_list) + "\n"
-    print(result_text)
-    with open("SalesResults.txt", "w", encoding="utf-8") as result_file:
-        result_file.write("\n".join(output))
-        result_file.write("\n" + result_text)
+        result_text += (
+            "Alertas encontradas:\n" + "\n".join(alert_list) + "\n"
+        )
+    return result_text
+
+
+def load_price_index(price_file):
+    """Carga el catálogo de precios y lo indexa por producto."""
+    price_data = load_json_file(price_file)
+    for product in price_data:
+        if "title" in product:
+            product["Product"] = product.pop("title")
+    return build_price_index(price_data)
+
+
+def main():
+    """Función principal para ejecutar el programa."""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    if len(args) != 2 or not options <= OPTIONS:
+        print(
+            "Uso: python computeSales.py priceCatalogue.json "
+            "salesRecord.json [--stream] [--jsonl] [--parallel] "
+            "[--quiet] [--incremental]"
+        )
+        sys.exit(1)
+    price_file, sales_file = args
+    start_time = time.time()
+    price_index, duplicate_list = load_price_index(price_file)
+    rollup_mode = options & {"--parallel", "--incremental"}
+    with SalesReportWriter(
+        "SalesResults.txt",
+        None if rollup_mode else "ProductList.csv",
+        echo="--quiet" not in options,
+    ) as report:
+        if "--incremental" in options:
+            total_sales, error_list, alert_list, rollups = _run_incremental(
+                price_index, price_file, sales_file, options, report
+            )
+        elif "--parallel" in options:
+            total_sales, error_list, alert_list, rollups = _run_parallel(
+                price_index, sales_file, options
+            )
+        else:
+            total_sales, error_list, alert_list, rollups = _run_serial(
+                price_index, sales_file, options, report
+            )
+        if rollups is not None:
+            for line in format_rollups(rollups):
+                report.write_line(line)
+        report.write_summary(_format_summary(
+            total_sales, time.time() - start_time,
+            duplicate_list + error_list, alert_list
+        ))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""Pruebas unitarias"""
+import unittest
+from compute_sales import aggregate_sales, format_rollups
+
+PRICES = {"Cafe": 12.5, "Pan": 3.1, "Jugo": 7.25}
+
+
+def make_sales():
+    """Ventas con SALE_ID de uno y dos dígitos y algunos errores."""
+    sales = []
+    for number in range(1, 31):
+        day = f"0{number % 3 + 1}/01/24"
+        sales.append({"SALE_ID": number, "SALE_Date": day,
+                      "Product": "Cafe", "Quantity": number % 4})
+        sales.append({"SALE_ID": number, "SALE_Date": "01/01/24",
+                      "Product": "Pan", "Quantity": -1})
+    sales.append({"SALE_ID": 31, "SALE_Date": "01/01/24",
+                  "Product": "Te", "Quantity": 1})
+    sales.append({"SALE_ID": None, "SALE_Date": "01/01/24",
+                  "Product": "Jugo", "Quantity": 2})
+    return sales
+
+
+class TestAggregateSales(unittest.TestCase):
+    """Pruebas de los totales agrupados."""
+
+    def test_parallel_matches_serial(self):
+        """Varios procesos dan exactamente el mismo reporte que uno."""
+        serial = aggregate_sales(PRICES, make_sales(), workers=1,
+                                 shard_size=7)
+        parallel = aggregate_sales(PRICES, make_sales(), workers=3,
+                                   shard_size=7)
+        self.assertEqual(parallel["total"], serial["total"])
+        self.assertEqual(format_rollups(parallel), format_rollups(serial))
+        self.assertEqual(parallel["errors"], serial["errors"])
+        self.assertEqual(parallel["alerts"], serial["alerts"])
+
+    def test_sale_ids_sort_numerically(self):
+        """Los SALE_ID numéricos se ordenan por valor, no como texto."""
+        result = aggregate_sales(PRICES, make_sales(), workers=1)
+        lines = format_rollups(result)
+        start = lines.index(next(line for line in lines
+                                 if line.startswith("Venta")))
+        ids = [line.split()[0] for line in lines[start + 1:-1]]
+        self.assertEqual(ids, [str(n) for n in range(1, 31)] + ["None"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Benchmark de save_to_file / load_from_file de reservaciones.
+
+Cada medición corre en un proceso nuevo, así que el RSS máximo reportado
+es el de guardar o cargar ese snapshot y nada más. HELD_RSS es el RSS
+que queda con las reservaciones cargadas (ya sin el JSON intermedio).
+
+Uso:
+    python benchmark_storage.py [N] [--formats=rows,columns]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows: sin RSS máximo.
+    resource = None
+
+from hotel_reservation import Reservation
+
+DEFAULT_COUNT = 1_000_000
+
+
+def peak_rss_mb():
+    """RSS máximo del proceso en MB (None si no se puede medir)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def current_rss_mb():
+    """RSS actual en MB, leído de /proc (None fuera de Linux)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as file:
+            pages = int(file.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def _use(data_file, snapshot_format):
+    Reservation.DATA_FILE = data_file
+    if hasattr(Reservation, "SNAPSHOT_FORMAT"):
+        Reservation.SNAPSHOT_FORMAT = snapshot_format
+
+
+def save_case(data_file, snapshot_format, count):
+    """Genera ``count`` reservaciones y mide save_to_file."""
+    _use(data_file, snapshot_format)
+    reservations = [
+        Reservation(number, number % 5000, number % 200,
+                    f"2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}",
+                    f"2025-{number % 12 + 1:02d}-{number % 28 + 2:02d}")
+        for number in range(count)]
+    started = time.perf_counter()
+    Reservation.save_to_file(reservations)
+    return time.perf_counter() - started, peak_rss_mb()
+
+
+def load_case(data_file, snapshot_format):
+    """Mide load_from_file del snapshot guardado por save_case."""
+    _use(data_file, snapshot_format)
+    started = time.perf_counter()
+    reservations = Reservation.load_from_file()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    return elapsed, peak_rss_mb(), current_rss_mb(), len(reservations)
+
+
+def run_isolated(function, *args):
+    """Corre una medición en un proceso recién creado."""
+    with ProcessPoolExecutor(max_workers=1,
+                             mp_context=get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def benchmark(count, formats):
+    """Regresa una fila de resultados por formato."""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for snapshot_format in formats:
+            data_file = os.path.join(directory, f"{snapshot_format}.json")
+            save_seconds, save_rss = run_isolated(
+                save_case, data_file, snapshot_format, count)
+            load_seconds, load_rss, held_rss, loaded = run_isolated(
+                load_case, data_file, snapshot_format)
+            rows.append((snapshot_format, loaded, save_seconds, save_rss,
+                         load_seconds, load_rss, held_rss,
+                         os.path.getsize(data_file) / 2 ** 20))
+    return rows
+
+
+def main():
+    """Punto de entrada."""
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    options = [a for a in sys.argv[1:] if a.startswith("--")]
+    formats = ["rows", "columns"]
+    for option in options:
+        if option.startswith("--formats="):
+            formats = option.split("=", 1)[1].split(",")
+    if len(args) > 1 or (args and not args[0].isdigit()) or \
+            any(not option.startswith("--formats=") for option in options):
+        print("Uso: python benchmark_storage.py [N] "
+              "[--formats=rows,columns]")
+        sys.exit(1)
+    count = int(args[0]) if args else DEFAULT_COUNT
+    print(f"{'FORMATO':<8} {'N':>9} {'SAVE_S':>7} {'SAVE_RSS':>9} "
+          f"{'LOAD_S':>7} {'LOAD_RSS':>9} {'HELD_RSS':>9} {'MB':>7}")
+    for (snapshot_format, loaded, save_s, save_rss, load_s, load_rss,
+         held_rss, size) in benchmark(count, formats):
+        print(f"{snapshot_format:<8} {loaded:>9} {save_s:>7.2f} "
+              f"{save_rss or 0:>9.0f} {load_s:>7.2f} {load_rss or 0:>9.0f} "
+              f"{held_rss or 0:>9.0f} {size:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
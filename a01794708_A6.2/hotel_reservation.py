@@ -1,18 +1,196 @@
 """clase de hoteles,clientes y reservaciones."""
 import json
 import os
+import sys
+import threading
+from datetime import date
+
+from storage import (
+    Registry, Repository, VersionConflict, read_state, snapshot_payload,
+    write_snapshot)
+
+
+def intern(value):
+    """Internaliza cadenas muy repetidas (ubicaciones, fechas) para que
+    todas las entidades compartan un solo objeto."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def iso_date(value):
+    """Normaliza una fecha de entrada/salida: un ``date`` se guarda como
+    cadena ISO (así se serializa igual que las que vienen del JSON); None
+    y las cadenas se conservan y las cadenas se validan al reservar."""
+    if isinstance(value, date):
+        value = date.isoformat(value)
+    elif value is not None and not isinstance(value, str):
+        raise TypeError(f"Fecha inválida: {value!r}")
+    return intern(value)
+
+
+def night_range(check_in, check_out):
+    """Convierte fechas de entrada/salida (ISO o ``date``) en el rango de
+    noches [inicio, fin) como ordinales de día."""
+    start, end = (
+        (date.fromisoformat(value) if isinstance(value, str) else value)
+        .toordinal() for value in (check_in, check_out))
+    if end <= start:
+        raise ValueError("La salida debe ser posterior a la entrada.")
+    return start, end
+
+
+class OccupancyTree:
+    """Ocupación por noche de un hotel: árbol de segmentos disperso sobre
+    ordinales de día con suma en rango y máximo en rango en O(log D).
+
+    ``pending[n]`` es lo sumado a todo el rango del nodo y ``peak[n]`` la
+    ocupación máxima dentro de él (incluyendo ``pending[n]``); sólo existen
+    los nodos que tocó alguna reservación.
+    """
+
+    SIZE = 1 << 22  # > date.max.toordinal()
+
+    def __init__(self):
+        self.peak = {}
+        self.pending = {}
+
+    def add(self, start, end, delta):
+        """Suma ``delta`` a las noches [start, end)."""
+        self._add(start, end, delta, (1, 0, self.SIZE))
+
+    def max(self, start, end):
+        """Ocupación máxima en las noches [start, end)."""
+        return self._max(start, end, (1, 0, self.SIZE))
+
+    def _add(self, start, end, delta, span):
+        node, low, high = span
+        if end <= low or high <= start:
+            return
+        if start <= low and high <= end:
+            self.pending[node] = self.pending.get(node, 0) + delta
+            self.peak[node] = self.peak.get(node, 0) + delta
+            return
+        middle = (low + high) // 2
+        self._add(start, end, delta, (2 * node, low, middle))
+        self._add(start, end, delta, (2 * node + 1, middle, high))
+        self.peak[node] = self.pending.get(node, 0) + max(
+            self.peak.get(2 * node, 0), self.peak.get(2 * node + 1, 0))
+
+    def _max(self, start, end, span):
+        node, low, high = span
+        if end <= low or high <= start:
+            return 0
+        if start <= low and high <= end:
+            return self.peak.get(node, 0)
+        middle = (low + high) // 2
+        return self.pending.get(node, 0) + max(
+            self._max(start, end, (2 * node, low, middle)),
+            self._max(start, end, (2 * node + 1, middle, high)))
+
+
+class Availability(Registry):
+    """Ocupación de todos los hoteles, derivada de las reservaciones.
+
+    Se construye una vez recorriendo el repositorio de reservaciones y
+    después se pone al día con los cambios que el repositorio registró
+    (propios o aplicados del journal de otros procesos); sólo se
+    reconstruye si el repositorio ya no tiene ese detalle (recarga del
+    snapshot, backend SQLite con commits de otra conexión). ``lock``
+    protege los árboles: quien escribe lo toma después del lock del
+    repositorio y quien lee no toma otro lock mientras lo tiene.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, repository):
+        self.repository = repository
+        self.trees = {}
+        self.version = None
+        self.lock = threading.RLock()
+
+    @classmethod
+    def for_class(cls, reservation_cls):
+        """Regresa la disponibilidad sincronizada con el repositorio."""
+        availability = cls.instance_for(
+            Repository.for_class(reservation_cls), cls)
+        availability.sync()
+        return availability
+
+    def sync(self):
+        """Aplica los cambios del repositorio desde la última vez."""
+        while True:
+            known = self.version
+            version, changes, rebuild = self.repository.changes_since(known)
+            with self.lock:
+                if self.version != known:
+                    continue  # Otro hilo la actualizó mientras tanto.
+                if rebuild:
+                    self.trees = {}
+                for previous, current in changes:
+                    if previous is not None:
+                        self.apply(previous, -1)
+                    if current is not None:
+                        self.apply(current, 1)
+                self.version = version
+                return
+
+    def apply(self, reservation, delta):
+        """Suma (1) o resta (-1) las noches de una reservación con fechas."""
+        if reservation.check_in is None or reservation.check_out is None:
+            return
+        start, end = night_range(reservation.check_in, reservation.check_out)
+        tree = self.trees.setdefault(reservation.hotel_id, OccupancyTree())
+        tree.add(start, end, delta)
+
+    def confirm(self, version, changes):
+        """Marca como aplicados ``changes`` cambios hechos desde
+        ``version``; si hubo otros, fuerza una reconstrucción."""
+        if self.repository.version == version + changes:
+            self.version = self.repository.version
+        else:
+            self.version = None
+
+    def occupied(self, hotel_id, start, end):
+        """Habitaciones ocupadas la noche más llena de [start, end)."""
+        with self.lock:
+            tree = self.trees.get(hotel_id)
+            return tree.max(start, end) if tree else 0
+
+    def fits(self, reservation, hotel):
+        """True si hay habitación libre para la reservación en el hotel.
+
+        Las reservaciones sin fechas o de hoteles desconocidos no ocupan
+        habitaciones y siempre caben."""
+        if reservation.check_in is None or reservation.check_out is None \
+                or hotel is None:
+            return True
+        start, end = night_range(reservation.check_in, reservation.check_out)
+        return self.occupied(hotel.hotel_id, start, end) < hotel.rooms
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=Availability.reset)
 
 
 class Hotel:
     """Clase que representa un hotel."""
 
     DATA_FILE = "hotels.json"
+    ID_FIELD = "hotel_id"
+    INDEXES = ("location",)
+    FIELDS = ("hotel_id", "name", "location", "rooms", "version")
+    TABLE = "hotels"
+    STORAGE = "json"  # "json" o "sqlite" (ver BACKENDS).
+    DATABASE_FILE = "hotel_reservation.db"
+    SNAPSHOT_FORMAT = "rows"  # "rows" o "columns" (ver snapshot_payload).
+    __slots__ = FIELDS
 
-    def __init__(self, hotel_id, name, location, rooms):
+    def __init__(self, hotel_id, name, location, rooms, version=0):
         self.hotel_id = hotel_id
         self.name = name
-        self.location = location
+        self.location = intern(location)
         self.rooms = rooms
+        self.version = version
 
     def to_dict(self):
         """Convertiro objeto a dic"""
@@ -21,25 +199,23 @@ class Hotel:
             "name": self.name,
             "location": self.location,
             "rooms": self.rooms,
+            "version": self.version,
         }
 
     @classmethod
     def save_to_file(cls, hotels):
-        """Guarda la lista de hoteles en un archivo JSON."""
+        """Guarda la lista de hoteles en un archivo JSON (snapshot
+        atómico que reemplaza también el journal)."""
         try:
-            with open(cls.DATA_FILE, "w", encoding="utf-8") as file:
-                json.dump([hotel.to_dict() for hotel in hotels], file)
+            write_snapshot(cls.DATA_FILE, snapshot_payload(cls, hotels))
         except IOError as e:
             print(f"Error al guardar los hoteles: {e}")
 
     @classmethod
     def load_from_file(cls):
-        """Carga la lista de hoteles desde un archivo JSON."""
-        if not os.path.exists(cls.DATA_FILE):
-            return []
+        """Carga la lista de hoteles desde el archivo JSON y su journal."""
         try:
-            with open(cls.DATA_FILE, "r", encoding="utf-8") as file:
-                return [cls(**data) for data in json.load(file)]
+            return read_state(cls)
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error al cargar los hoteles: {e}")
             return []
@@ -47,57 +223,100 @@ class Hotel:
     @classmethod
     def create_hotel(cls, hotel_id, name, location, rooms):
         """Crea un nuevo hotel y lo guarda en archivo."""
-        hotels = cls.load_from_file()
-        hotels.append(cls(hotel_id, name, location, rooms))
-        cls.save_to_file(hotels)
+        Repository.for_class(cls).add(cls(hotel_id, name, location, rooms))
+
+    @classmethod
+    def create_hotels_many(cls, rows):
+        """Crea varios hoteles de tuplas (hotel_id, name, location, rooms)."""
+        Repository.for_class(cls).add_many(cls(*row) for row in rows)
 
     @classmethod
     def delete_hotel(cls, hotel_id):
         """Elimina un hotel por su ID."""
-        hotels = cls.load_from_file()
-        hotels = [hotel for hotel in hotels if hotel.hotel_id != hotel_id]
-        cls.save_to_file(hotels)
+        Repository.for_class(cls).remove(hotel_id)
 
     @classmethod
     def display_hotel_info(cls, hotel_id):
         """Muestra la información de un hotel por su ID."""
-        hotels = cls.load_from_file()
-        for hotel in hotels:
-            if hotel.hotel_id == hotel_id:
-                print(f"Hotel ID: {hotel.hotel_id}")
-                print(f"Nombre: {hotel.name}")
-                print(f"Ubicación: {hotel.location}")
-                print(f"Habitaciones: {hotel.rooms}")
-                return
-        print("Hotel no encontrado.")
-
-    @classmethod
-    def modify_hotel_info(cls, hotel_id, name=None, location=None, rooms=None):
-        """Modifica la información de un hotel."""
-        hotels = cls.load_from_file()
-        for hotel in hotels:
-            if hotel.hotel_id == hotel_id:
-                if name:
-                    hotel.name = name
-                if location:
-                    hotel.location = location
-                if rooms:
-                    hotel.rooms = rooms
-                cls.save_to_file(hotels)
-                print("Información del hotel modificada.")
-                return
-        print("Hotel no encontrado.")
+        hotel = Repository.for_class(cls).get(hotel_id)
+        if hotel is None:
+            print("Hotel no encontrado.")
+            return
+        print(f"Hotel ID: {hotel.hotel_id}")
+        print(f"Nombre: {hotel.name}")
+        print(f"Ubicación: {hotel.location}")
+        print(f"Habitaciones: {hotel.rooms}")
+
+    @classmethod
+    def modify_hotel_info(cls, hotel_id, name=None, location=None, rooms=None,
+                          expected_version=None):
+        """Modifica la información de un hotel; con ``expected_version`` no
+        modifica si alguien más lo cambió desde que se leyó."""
+        changes = {field: value for field, value in
+                   (("name", name), ("location", intern(location)),
+                    ("rooms", rooms))
+                   if value}
+        try:
+            hotel = Repository.for_class(cls).update(
+                hotel_id, expected_version, **changes)
+        except VersionConflict:
+            print("El hotel fue modificado por alguien más.")
+            return False
+        if hotel is None:
+            print("Hotel no encontrado.")
+            return False
+        print("Información del hotel modificada.")
+        return True
+
+    @classmethod
+    def find_by_location(cls, location):
+        """Regresa los hoteles de una ubicación (índice secundario)."""
+        return Repository.for_class(cls).find("location", location)
+
+    @classmethod
+    def free_rooms(cls, hotel_id, check_in, check_out):
+        """Habitaciones libres todas las noches del rango (None si el hotel
+        no existe)."""
+        hotel = Repository.for_class(cls).get(hotel_id)
+        if hotel is None:
+            return None
+        start, end = night_range(check_in, check_out)
+        occupied = Availability.for_class(Reservation).occupied(
+            hotel_id, start, end)
+        return hotel.rooms - occupied
+
+    @classmethod
+    def find_available(cls, check_in, check_out, location=None):
+        """Hoteles (de una ubicación, opcionalmente) con al menos una
+        habitación libre en todas las noches del rango."""
+        start, end = night_range(check_in, check_out)
+        availability = Availability.for_class(Reservation)
+        repository = Repository.for_class(cls)
+        hotels = (repository.all() if location is None
+                  else repository.find("location", location))
+        return [hotel for hotel in hotels
+                if availability.occupied(hotel.hotel_id, start, end)
+                < hotel.rooms]
 
 
 class Customer:
     """Clase que representa un cliente."""
 
     DATA_FILE = "customers.json"
+    ID_FIELD = "customer_id"
+    INDEXES = ()
+    FIELDS = ("customer_id", "name", "email", "version")
+    TABLE = "customers"
+    STORAGE = "json"  # "json" o "sqlite" (ver BACKENDS).
+    DATABASE_FILE = "hotel_reservation.db"
+    SNAPSHOT_FORMAT = "rows"  # "rows" o "columns" (ver snapshot_payload).
+    __slots__ = FIELDS
 
-    def __init__(self, customer_id, name, email):
+    def __init__(self, customer_id, name, email, version=0):
         self.customer_id = customer_id
         self.name = name
         self.email = email
+        self.version = version
 
     def to_dict(self):
         """regresa diccionario de custumer"""
@@ -105,25 +324,23 @@ class Customer:
             "customer_id": self.customer_id,
             "name": self.name,
             "email": self.email,
+            "version": self.version,
         }
 
     @classmethod
     def save_to_file(cls, customers):
-        """Guarda la lista de clientes en un archivo JSON."""
+        """Guarda la lista de clientes en un archivo JSON (snapshot
+        atómico que reemplaza también el journal)."""
         try:
-            with open(cls.DATA_FILE, "w", encoding="utf-8") as file:
-                json.dump([customer.to_dict() for customer in customers], file)
+            write_snapshot(cls.DATA_FILE, snapshot_payload(cls, customers))
         except IOError as e:
             print(f"Error al guardar los clientes: {e}")
 
     @classmethod
     def load_from_file(cls):
-        """Carga la lista de clientes desde un archivo JSON."""
-        if not os.path.exists(cls.DATA_FILE):
-            return []
+        """Carga la lista de clientes desde el archivo JSON y su journal."""
         try:
-            with open(cls.DATA_FILE, "r", encoding="utf-8") as file:
-                return [cls(**data) for data in json.load(file)]
+            return read_state(cls)
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error al cargar los clientes: {e}")
             return []
@@ -131,57 +348,74 @@ class Customer:
     @classmethod
     def create_customer(cls, customer_id, name, email):
         """Crea un nuevo cliente y lo guarda en archivo."""
-        customers = cls.load_from_file()
-        customers.append(cls(customer_id, name, email))
-        cls.save_to_file(customers)
+        Repository.for_class(cls).add(cls(customer_id, name, email))
+
+    @classmethod
+    def create_customers_many(cls, rows):
+        """Crea varios clientes de tuplas (customer_id, name, email)."""
+        Repository.for_class(cls).add_many(cls(*row) for row in rows)
 
     @classmethod
     def delete_customer(cls, customer_id):
         """Elimina un cliente por su ID."""
-        customers = cls.load_from_file()
-        customers = [
-            customer for customer
-            in customers if customer.customer_id != customer_id
-            ]
-        cls.save_to_file(customers)
+        Repository.for_class(cls).remove(customer_id)
 
     @classmethod
     def display_customer_info(cls, customer_id):
         """Muestra la información de un cliente por su ID."""
-        customers = cls.load_from_file()
-        for customer in customers:
-            if customer.customer_id == customer_id:
-                print(f"Cliente ID: {customer.customer_id}")
-                print(f"Nombre: {customer.name}")
-                print(f"Email: {customer.email}")
-                return
-        print("Cliente no encontrado.")
-
-    @classmethod
-    def modify_customer_info(cls, customer_id, name=None, email=None):
-        """Modifica la información de un cliente."""
-        customers = cls.load_from_file()
-        for customer in customers:
-            if customer.customer_id == customer_id:
-                if name:
-                    customer.name = name
-                if email:
-                    customer.email = email
-                cls.save_to_file(customers)
-                print("Información del cliente modificada.")
-                return
-        print("Cliente no encontrado.")
+        customer = Repository.for_class(cls).get(customer_id)
+        if customer is None:
+            print("Cliente no encontrado.")
+            return
+        print(f"Cliente ID: {customer.customer_id}")
+        print(f"Nombre: {customer.name}")
+        print(f"Email: {customer.email}")
+
+    @classmethod
+    def modify_customer_info(cls, customer_id, name=None, email=None,
+                             expected_version=None):
+        """Modifica la información de un cliente; con ``expected_version``
+        no modifica si alguien más lo cambió desde que se leyó."""
+        changes = {field: value for field, value in
+                   (("name", name), ("email", email)) if value}
+        try:
+            customer = Repository.for_class(cls).update(
+                customer_id, expected_version, **changes)
+        except VersionConflict:
+            print("El cliente fue modificado por alguien más.")
+            return False
+        if customer is None:
+            print("Cliente no encontrado.")
+            return False
+        print("Información del cliente modificada.")
+        return True
 
 
 class Reservation:
     """Clase que representa una reservación."""
 
     DATA_FILE = "reservations.json"
+    ID_FIELD = "reservation_id"
+    INDEXES = ("customer_id", "hotel_id")
+    FIELDS = ("reservation_id", "customer_id", "hotel_id",
+              "check_in", "check_out", "version")
+    TABLE = "reservations"
+    STORAGE = "json"  # "json" o "sqlite" (ver BACKENDS).
+    DATABASE_FILE = "hotel_reservation.db"
+    SNAPSHOT_FORMAT = "rows"  # "rows" o "columns" (ver snapshot_payload).
+    __slots__ = FIELDS
 
-    def __init__(self, reservation_id, customer_id, hotel_id):
+    # Argumentos en el orden de FIELDS: el snapshot por columnas y SQLite
+    # construyen las reservaciones posicionalmente.
+    def __init__(  # pylint: disable=R0913,R0917
+            self, reservation_id, customer_id, hotel_id,
+            check_in=None, check_out=None, version=0):
         self.reservation_id = reservation_id
         self.customer_id = customer_id
         self.hotel_id = hotel_id
+        self.check_in = iso_date(check_in)
+        self.check_out = iso_date(check_out)
+        self.version = version
 
     def to_dict(self):
         """regresa diccionario de reservacion"""
@@ -189,41 +423,110 @@ class Reservation:
             "reservation_id": self.reservation_id,
             "customer_id": self.customer_id,
             "hotel_id": self.hotel_id,
+            "check_in": self.check_in,
+            "check_out": self.check_out,
+            "version": self.version,
         }
 
     @classmethod
     def save_to_file(cls, reservations):
-        """Guarda la lista de reservaciones en un archivo JSON."""
+        """Guarda la lista de reservaciones en un archivo JSON (snapshot
+        atómico que reemplaza también el journal)."""
         try:
-            with open(cls.DATA_FILE, "w", encoding="utf-8") as file:
-                json.dump([res.to_dict() for res in reservations], file)
+            write_snapshot(cls.DATA_FILE,
+                           snapshot_payload(cls, reservations))
         except IOError as e:
             print(f"Error al guardar las reservaciones: {e}")
 
     @classmethod
     def load_from_file(cls):
-        """Carga la lista de reservaciones desde un archivo JSON."""
-        if not os.path.exists(cls.DATA_FILE):
-            return []
+        """Carga las reservaciones desde el archivo JSON y su journal."""
         try:
-            with open(cls.DATA_FILE, "r", encoding="utf-8") as file:
-                return [cls(**data) for data in json.load(file)]
+            return read_state(cls)
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error al cargar las reservaciones: {e}")
             return []
 
     @classmethod
-    def create_reservation(cls, reservation_id, customer_id, hotel_id):
-        """Crea una nueva reservación."""
-        reservations = cls.load_from_file()
-        reservations.append(cls(reservation_id, customer_id, hotel_id))
-        cls.save_to_file(reservations)
+    def create_reservation(cls, reservation_id, customer_id, hotel_id,
+                           check_in=None, check_out=None):
+        """Crea una nueva reservación; regresa False si el hotel no tiene
+        habitaciones libres en esas fechas."""
+        reservation = cls(reservation_id, customer_id, hotel_id,
+                          check_in, check_out)
+        if cls._reserve([reservation]):
+            print("No hay habitaciones disponibles en esas fechas.")
+            return False
+        return True
+
+    @classmethod
+    def create_reservations_many(cls, rows):
+        """Crea varias reservaciones de tuplas (reservation_id,
+        customer_id, hotel_id[, check_in, check_out]); regresa las que no
+        cupieron (sobreventa o fechas inválidas)."""
+        return cls._reserve([cls(*row) for row in rows])
+
+    @classmethod
+    def _reserve(cls, reservations):
+        """Guarda las reservaciones que caben y regresa las rechazadas.
+
+        La revisión de disponibilidad y la escritura ocurren dentro del
+        mismo ``batch()`` (lock exclusivo), así que dos procesos no pueden
+        vender la misma habitación."""
+        repository = Repository.for_class(cls)
+        hotels = Repository.for_class(Hotel)
+        hotel_cache = {}
+        accepted = {}  # Por ID: una repetida en el lote reemplaza a la otra.
+        rejected = []
+        with repository.batch():
+            availability = Availability.for_class(cls)
+            with availability.lock:
+                version = availability.version
+                for reservation in reservations:
+                    previous = accepted.get(reservation.reservation_id)
+                    if previous is None:
+                        previous = repository.get(reservation.reservation_id)
+                    if previous is not None:  # Se reemplaza: libera noches.
+                        availability.apply(previous, -1)
+                    if reservation.hotel_id not in hotel_cache:
+                        hotel_cache[reservation.hotel_id] = hotels.get(
+                            reservation.hotel_id)
+                    try:
+                        fits = availability.fits(
+                            reservation, hotel_cache[reservation.hotel_id])
+                    except ValueError:
+                        fits = False
+                    if fits:
+                        availability.apply(reservation, 1)
+                        accepted[reservation.reservation_id] = reservation
+                    else:
+                        if previous is not None:
+                            availability.apply(previous, 1)
+                        rejected.append(reservation)
+                repository.add_many(accepted.values())
+                availability.confirm(version, len(accepted))
+        return rejected
 
     @classmethod
     def cancel_reservation(cls, reservation_id):
         """Cancela una reservación por su ID."""
-        reservations = cls.load_from_file()
-        reservations = [res for res in reservations
-                        if res.reservation_id != reservation_id]
-        cls.save_to_file(reservations)
+        repository = Repository.for_class(cls)
+        with repository.batch():
+            availability = Availability.for_class(cls)
+            with availability.lock:
+                version = availability.version
+                reservation = repository.remove(reservation_id)
+                if reservation is not None:
+                    availability.apply(reservation, -1)
+                availability.confirm(version, reservation is not None)
         print(f"Reserva {reservation_id} cancelada.")
+
+    @classmethod
+    def find_by_customer(cls, customer_id):
+        """Regresa las reservaciones de un cliente (índice secundario)."""
+        return Repository.for_class(cls).find("customer_id", customer_id)
+
+    @classmethod
+    def find_by_hotel(cls, hotel_id):
+        """Regresa las reservaciones de un hotel (índice secundario)."""
+        return Repository.for_class(cls).find("hotel_id", hotel_id)
@@ -0,0 +1,401 @@
+"""Servicio asyncio (JSON por TCP) sobre hotel_reservation.
+
+Cada petición es una línea JSON ``{"id": n, "op": "...", "args": {...}}``
+y cada respuesta ``{"id": n, "ok": true, "result": ..., "message": "..."}``
+(``"ok": false`` con ``"error"`` si falla). Un cliente puede tener muchas
+peticiones en vuelo; las respuestas llevan el ``id`` de su petición.
+
+Las lecturas se contestan en un pool de hilos, así que esperar el lock de
+un repositorio no detiene el event loop. Las escrituras se encolan y una
+sola tarea las aplica por lotes en otro hilo: todo lo que llegó mientras
+se escribía el lote anterior se aplica con los locks de los repositorios
+tomados una vez (``batch_all``) y el fsync se hace después de soltarlos.
+Los mensajes que imprime cada operación se capturan sólo en el hilo
+escritor (``ThreadOutput``).
+
+Uso:
+    python reservation_service.py serve [--host=H] [--port=N]
+    python reservation_service.py load [--host=H] [--port=N] [--local]
+        [--clients=N] [--requests=N] [--writes=0.2]
+"""
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from hotel_reservation import Customer, Hotel, Reservation
+from storage import Repository, batch_all
+
+HOST = "127.0.0.1"
+PORT = 8765
+READ_THREADS = 4
+
+WRITE_OPS = {
+    "create_hotel": Hotel.create_hotel,
+    "modify_hotel": Hotel.modify_hotel_info,
+    "delete_hotel": Hotel.delete_hotel,
+    "create_customer": Customer.create_customer,
+    "modify_customer": Customer.modify_customer_info,
+    "delete_customer": Customer.delete_customer,
+    "create_reservation": Reservation.create_reservation,
+    "cancel_reservation": Reservation.cancel_reservation,
+}
+
+
+def _display(entity_cls):
+    def display(entity_id):
+        """Regresa la entidad como dict (None si no existe)."""
+        entity = Repository.for_class(entity_cls).get(entity_id)
+        return None if entity is None else entity.to_dict()
+    return display
+
+
+def _find_available(check_in, check_out, location=None):
+    """Regresa los hoteles con habitaciones libres como dicts."""
+    return [hotel.to_dict()
+            for hotel in Hotel.find_available(check_in, check_out, location)]
+
+
+READ_OPS = {
+    "display_hotel": _display(Hotel),
+    "display_customer": _display(Customer),
+    "display_reservation": _display(Reservation),
+    "find_available": _find_available,
+}
+
+
+class ServiceError(Exception):
+    """Error reportado por el servicio a una petición."""
+
+
+class ThreadOutput(io.TextIOBase):
+    """``sys.stdout`` que separa lo que imprime cada hilo.
+
+    Lo que un hilo escribe dentro de ``capture()`` va a su propio buffer;
+    lo de los demás hilos sigue yendo a la salida envuelta.
+    """
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.local = threading.local()
+
+    @classmethod
+    def install(cls):
+        """Envuelve ``sys.stdout`` (si no lo está ya) y lo regresa."""
+        if not isinstance(sys.stdout, cls):
+            sys.stdout = cls(sys.stdout)
+        return sys.stdout
+
+    @classmethod
+    def uninstall(cls):
+        """Regresa ``sys.stdout`` a la salida envuelta."""
+        if isinstance(sys.stdout, cls):
+            sys.stdout = sys.stdout.stream
+
+    def _target(self):
+        buffer = getattr(self.local, "buffer", None)
+        return self.stream if buffer is None else buffer
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    @contextmanager
+    def capture(self):
+        """Captura lo que imprime este hilo; regresa el buffer."""
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+
+class ReservationService:
+    """Servidor TCP; ``flushes`` cuenta los lotes de escritura aplicados."""
+
+    def __init__(self):
+        self.queue = None
+        self.writer = ThreadPoolExecutor(max_workers=1)
+        self.readers = ThreadPoolExecutor(max_workers=READ_THREADS)
+        self.flushes = 0
+        self.writer_task = None
+        self.server = None
+
+    async def start(self, host=HOST, port=PORT):
+        """Empieza a escuchar; regresa el puerto (útil con port=0)."""
+        self.queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self._write_loop())
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Deja de escuchar y termina el último lote pendiente."""
+        self.server.close()
+        await self.server.wait_closed()
+        await self.queue.join()
+        self.writer_task.cancel()
+        self.writer.shutdown()
+        self.readers.shutdown()
+        ThreadOutput.uninstall()
+
+    async def _serve(self, reader, writer):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, line, writer):
+        request = {}
+        try:
+            request = json.loads(line)
+            result, message = await self.execute(
+                request["op"], request.get("args", {}))
+            response = {"ok": True, "result": result, "message": message}
+        except Exception as e:  # pylint: disable=W0718
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        response["id"] = request.get("id")
+        writer.write(json.dumps(response).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def execute(self, op, args):
+        """Ejecuta una operación; regresa (resultado, mensajes impresos)."""
+        loop = asyncio.get_running_loop()
+        if op in READ_OPS:
+            result = await loop.run_in_executor(
+                self.readers, lambda: READ_OPS[op](**args))
+            return result, ""
+        if op not in WRITE_OPS:
+            raise KeyError(f"Operación desconocida: {op}")
+        future = loop.create_future()
+        self.queue.put_nowait((WRITE_OPS[op], args, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            writes = [await self.queue.get()]
+            while not self.queue.empty():
+                writes.append(self.queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(
+                    self.writer, self._apply, writes)
+            except Exception as e:  # pylint: disable=W0718
+                results = [(e, None)] * len(writes)
+            self.flushes += 1
+            for (_, _, future), (error, result) in zip(writes, results):
+                if not future.done():
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+                self.queue.task_done()
+
+    @staticmethod
+    def _apply(writes):
+        """Aplica un lote de escrituras (en el hilo escritor)."""
+        results = []
+        output = ThreadOutput.install()
+        # Mismo orden de locks que Reservation._reserve.
+        with batch_all(Repository.for_class(entity_cls)
+                       for entity_cls in (Reservation, Hotel, Customer)):
+            for operation, args, _ in writes:
+                try:
+                    with output.capture() as printed:
+                        result = operation(**args)
+                    results.append((None, (result, printed.getvalue())))
+                except Exception as e:  # pylint: disable=W0718
+                    results.append((e, None))
+        return results
+
+
+class ReservationClient:
+    """Cliente del servicio; admite muchas llamadas concurrentes."""
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.waiting = {}
+        self.next_id = 0
+        self.reader_task = None
+
+    async def connect(self, host=HOST, port=PORT):
+        """Abre la conexión."""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.reader_task = asyncio.create_task(self._read_loop())
+        return self
+
+    async def _read_loop(self):
+        while line := await self.reader.readline():
+            response = json.loads(line)
+            future = self.waiting.pop(response.get("id"), None)
+            if future is None or future.done():
+                continue  # Petición ilegible o llamada ya cancelada.
+            if response["ok"]:
+                future.set_result(response["result"])
+            else:
+                future.set_exception(ServiceError(response["error"]))
+        waiting, self.waiting = self.waiting, {}
+        for future in waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Conexión cerrada"))
+
+    async def call(self, op, **args):
+        """Envía una petición y espera su resultado."""
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        request = {"id": self.next_id, "op": op, "args": args}
+        self.writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        """Cierra la conexión."""
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.reader_task.cancel()
+
+
+def percentile(values, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+async def load_test(address, clients=8, requests=2000, writes=0.2,
+                    hotels=50):
+    """Generador de carga contra ``address`` (host, puerto): regresa
+    peticiones/s y latencias en ms."""
+    setup = await ReservationClient().connect(*address)
+    await asyncio.gather(*(
+        setup.call("create_hotel", hotel_id=hotel_id, name=f"Hotel {hotel_id}",
+                   location=f"ciudad {hotel_id % 5}", rooms=20)
+        for hotel_id in range(hotels)))
+    await setup.close()
+    latencies = []
+    first_day = date(2025, 1, 1)
+
+    async def client(number):
+        connection = await ReservationClient().connect(*address)
+        rng = random.Random(number)
+        for index in range(requests // clients):
+            night = first_day + timedelta(days=rng.randrange(60))
+            started = time.perf_counter()
+            if rng.random() < writes:
+                await connection.call(
+                    "create_reservation",
+                    reservation_id=f"{number}-{index}", customer_id=number,
+                    hotel_id=rng.randrange(hotels),
+                    check_in=night.isoformat(),
+                    check_out=(night + timedelta(days=2)).isoformat())
+            elif rng.random() < 0.5:
+                await connection.call("display_hotel",
+                                      entity_id=rng.randrange(hotels))
+            else:
+                await connection.call(
+                    "find_available", check_in=night.isoformat(),
+                    check_out=(night + timedelta(days=2)).isoformat(),
+                    location=f"ciudad {rng.randrange(5)}")
+            latencies.append(time.perf_counter() - started)
+        await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_load(host, port, local, **settings):
+    """Corre la carga, levantando una instancia local si se pide."""
+    if not local:
+        return await load_test((host, port), **settings)
+    originals = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for entity_cls in (Hotel, Customer, Reservation):
+            originals[entity_cls] = (entity_cls.DATA_FILE,
+                                     entity_cls.DATABASE_FILE)
+            entity_cls.DATA_FILE = os.path.join(directory,
+                                                entity_cls.DATA_FILE)
+            entity_cls.DATABASE_FILE = os.path.join(
+                directory, entity_cls.DATABASE_FILE)
+        try:
+            service = ReservationService()
+            port = await service.start(host, 0)
+            try:
+                stats = await load_test((host, port), **settings)
+                stats["flushes"] = service.flushes
+            finally:
+                await service.close()
+        finally:
+            for entity_cls, (data_file, database_file) in originals.items():
+                entity_cls.DATA_FILE = data_file
+                entity_cls.DATABASE_FILE = database_file
+        return stats
+
+
+async def serve(host, port):
+    """Atiende peticiones hasta que se interrumpa el proceso."""
+    service = ReservationService()
+    port = await service.start(host, port)
+    print(f"Escuchando en {host}:{port}")
+    await service.server.serve_forever()
+
+
+def main():
+    """Punto de entrada: serve | load."""
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    options = dict(a[2:].partition("=")[::2]
+                   for a in sys.argv[1:] if a.startswith("--"))
+    if len(args) != 1 or args[0] not in ("serve", "load"):
+        print("Uso: python reservation_service.py serve [--host=H] "
+              "[--port=N]\n"
+              "     python reservation_service.py load [--host=H] "
+              "[--port=N] [--local] [--clients=N] [--requests=N] "
+              "[--writes=0.2]")
+        sys.exit(1)
+    host = options.get("host", HOST)
+    port = int(options.get("port", PORT))
+    if args[0] == "serve":
+        asyncio.run(serve(host, port))
+        return
+    stats = asyncio.run(run_load(
+        host, port, "local" in options,
+        clients=int(options.get("clients", 8)),
+        requests=int(options.get("requests", 2000)),
+        writes=float(options.get("writes", 0.2))))
+    print(f"Peticiones: {stats['requests']} en {stats['seconds']:.2f} s")
+    print(f"Peticiones/s: {stats['rps']:.0f}")
+    print(f"Latencia p50: {stats['p50_ms']:.2f} ms, "
+          f"p99: {stats['p99_ms']:.2f} ms")
+    if "flushes" in stats:
+        print(f"Lotes de escritura: {stats['flushes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,945 @@
+"""Almacenamiento de hoteles, clientes y reservaciones: locks entre
+procesos, journal, snapshots y los repositorios JSON y SQLite."""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import deque
+from contextlib import ExitStack, contextmanager, suppress
+from itertools import islice
+from operator import attrgetter
+
+try:
+    import fcntl
+except ImportError:  # Windows: los locks sólo protegen entre hilos.
+    fcntl = None
+
+JOURNAL_SUFFIX = ".log"  # El journal de "hotels.json" es "hotels.json.log".
+LOCK_SUFFIX = ".lock"  # Lock entre procesos de "hotels.json".
+COMPACT_MIN_RECORDS = 1000  # Registros mínimos antes de compactar.
+HISTORY_SIZE = 10000  # Cambios recientes que recuerda cada repositorio.
+
+
+def journal_path(data_file):
+    """Regresa la ruta del journal asociado a un DATA_FILE."""
+    return data_file + JOURNAL_SUFFIX
+
+
+def lock_path(data_file):
+    """Regresa la ruta del archivo de lock asociado a un DATA_FILE."""
+    return data_file + LOCK_SUFFIX
+
+
+class VersionConflict(Exception):
+    """La entidad cambió desde que se leyó (control optimista)."""
+
+
+class Registry:
+    """Instancias compartidas dentro del proceso, una por llave.
+
+    Cada subclase declara su propio ``_instances`` y ``_instances_lock``;
+    ``reset`` los vacía en un proceso hijo, que no debe reutilizar los
+    locks, archivos ni conexiones del padre.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def instance_for(cls, key, factory):
+        """Regresa la instancia de ``key``; la primera vez la crea con
+        ``factory(key)``."""
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = factory(key)
+            return cls._instances[key]
+
+    @classmethod
+    def forget(cls, matches):
+        """Olvida las instancias para las que ``matches`` es verdadero."""
+        with cls._instances_lock:
+            for key, instance in list(cls._instances.items()):
+                if matches(instance):
+                    del cls._instances[key]
+
+    @classmethod
+    def reset(cls):
+        """Empieza un registro vacío; regresa las instancias anteriores
+        (sin cerrarlas)."""
+        leftovers, cls._instances = cls._instances, {}
+        cls._instances_lock = threading.Lock()
+        return leftovers
+
+
+class FileLock(Registry):
+    """Lock advisory entre procesos (``flock``) sobre un archivo de lock.
+
+    Es reentrante y dentro del proceso también excluye a los demás hilos.
+    ``shared`` es para lecturas y ``exclusive`` para escrituras; pedir
+    ``exclusive`` dentro de ``shared`` convierte el lock mientras dure.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self.files = ExitStack()  # Dueño del archivo de lock abierto.
+        self.file = None
+        self.thread_lock = threading.RLock()
+        self.mode = 0
+
+    @classmethod
+    def for_path(cls, path):
+        """Regresa el lock compartido de esa ruta."""
+        return cls.instance_for(os.path.abspath(path), cls)
+
+    @contextmanager
+    def hold(self, exclusive):
+        """Toma el lock (compartido o exclusivo) mientras dure el bloque."""
+        with self.thread_lock:
+            previous = self.mode
+            if fcntl is not None and (not previous or (
+                    exclusive and previous == fcntl.LOCK_SH)):
+                if self.file is None:
+                    self.file = self.files.enter_context(
+                        open(self.path, "ab"))
+                self.mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                fcntl.flock(self.file.fileno(), self.mode)
+            try:
+                yield
+            finally:
+                if self.mode != previous:
+                    fcntl.flock(self.file.fileno(), previous or fcntl.LOCK_UN)
+                    self.mode = previous
+
+    def shared(self):
+        """Lock de lectura."""
+        return self.hold(False)
+
+    def exclusive(self):
+        """Lock de escritura."""
+        return self.hold(True)
+
+
+class Journal(Registry):
+    """Journal append-only de mutaciones (una línea JSON por registro).
+
+    ``append`` escribe y hace flush (barato); ``commit`` hace el fsync. Un
+    solo fsync cubre todo lo escrito hasta ese momento, así que los hilos
+    que esperan a la vez comparten el mismo fsync (group commit). Quien
+    agrega debe tener el lock exclusivo del DATA_FILE.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self.files = ExitStack()  # Dueño del archivo abierto para agregar.
+        self.file = None
+        self.lock = threading.Lock()
+        self.commit_lock = threading.Lock()
+        self.written = 0
+        self.durable = 0
+
+    @classmethod
+    def for_path(cls, path):
+        """Regresa el journal compartido de esa ruta."""
+        return cls.instance_for(os.path.abspath(path), cls)
+
+    def _drop_torn_tail(self, size):
+        """Corta una última línea incompleta (proceso interrumpido)."""
+        end = size
+        keep = 0
+        while end > 0:
+            start = max(0, end - 65536)
+            self.file.seek(start)
+            newline = self.file.read(end - start).rfind(b"\n")
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            end = start
+        self.file.truncate(keep)
+
+    def append(self, record):
+        """Agrega un registro; regresa su número de secuencia y el tamaño
+        del journal después de escribirlo."""
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        with self.lock:
+            if self.file is None:
+                self.file = self.files.enter_context(open(self.path, "a+b"))
+            size = os.fstat(self.file.fileno()).st_size
+            if size:
+                self.file.seek(size - 1)
+                if self.file.read(1) != b"\n":
+                    self._drop_torn_tail(size)
+            self.file.write(line)
+            self.file.flush()
+            self.written += 1
+            return self.written, os.fstat(self.file.fileno()).st_size
+
+    def commit(self, sequence=None):
+        """Hace durables los registros hasta ``sequence`` (o todos)."""
+        with self.commit_lock:
+            with self.lock:
+                if sequence is None:
+                    sequence = self.written
+                if self.durable >= sequence or self.file is None:
+                    return
+                target = self.written
+                fileno = self.file.fileno()
+            os.fsync(fileno)
+            self.durable = target
+
+    def truncate(self):
+        """Vacía el journal (tras escribir un snapshot completo)."""
+        with self.commit_lock, self.lock:
+            self.files.close()
+            self.file = None
+            if os.path.exists(self.path):
+                with open(self.path, "w", encoding="utf-8"):
+                    pass
+            self.durable = self.written
+
+
+def replay(path):
+    """Itera los registros de un journal, ignorando una última línea
+    incompleta (escritura interrumpida)."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.endswith("\n"):
+                return
+            yield json.loads(line)
+
+
+def snapshot_payload(entity_cls, entities):
+    """Contenido del snapshot en el formato ``SNAPSHOT_FORMAT`` de la clase.
+
+    "rows" es el formato de siempre (una lista de objetos JSON); "columns"
+    guarda una lista por campo (``{"fields": [...], "columns": [...]}``),
+    sin crear un dict por entidad y con un archivo más chico.
+    """
+    if entity_cls.SNAPSHOT_FORMAT == "columns":
+        entities = list(entities)
+        return {"fields": list(entity_cls.FIELDS),
+                "columns": [list(map(attrgetter(field), entities))
+                            for field in entity_cls.FIELDS]}
+    return [entity.to_dict() for entity in entities]
+
+
+def snapshot_state(entity_cls, snapshot):
+    """Regresa {id: entidad} a partir de un snapshot en cualquier formato."""
+    if isinstance(snapshot, list):
+        return {data[entity_cls.ID_FIELD]: entity_cls(**data)
+                for data in snapshot}
+    fields = tuple(snapshot["fields"])
+    columns = snapshot["columns"]
+    if fields == entity_cls.FIELDS[:len(fields)]:
+        entities = map(entity_cls, *columns)  # Posicional: sin dicts.
+    else:
+        entities = (entity_cls(**dict(zip(fields, values)))
+                    for values in zip(*columns))
+    return dict(zip(columns[fields.index(entity_cls.ID_FIELD)], entities))
+
+
+def read_state(entity_cls):
+    """Reconstruye las entidades: snapshot (DATA_FILE) + replay del
+    journal."""
+    data_file = entity_cls.DATA_FILE
+    state = {}
+    with FileLock.for_path(lock_path(data_file)).shared():
+        if os.path.exists(data_file):
+            with open(data_file, "r", encoding="utf-8") as file:
+                state = snapshot_state(entity_cls, json.load(file))
+        for record in replay(journal_path(data_file)):
+            if record["op"] == "put":
+                entity = entity_cls(**record["data"])
+                state[getattr(entity, entity_cls.ID_FIELD)] = entity
+            else:
+                state.pop(record["id"], None)
+    return list(state.values())
+
+
+def write_snapshot(data_file, payload):
+    """Escribe un snapshot completo y vacía el journal.
+
+    Con el lock exclusivo tomado se escribe un archivo temporal único en el
+    mismo directorio, se hace fsync y se renombra sobre el DATA_FILE, así
+    que los lectores ven el snapshot anterior o el nuevo, nunca uno a medias.
+    """
+    directory = os.path.dirname(os.path.abspath(data_file))
+    with FileLock.for_path(lock_path(data_file)).exclusive():
+        descriptor, temp_file = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                file.write(json.dumps(payload))  # Codificador en C.
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, data_file)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temp_file)
+            raise
+        Journal.for_path(journal_path(data_file)).truncate()
+
+
+class Repository(Registry):
+    """Interfaz de almacenamiento de una clase de entidades.
+
+    ``for_class`` elige el backend según el atributo ``STORAGE`` de la
+    clase ("json" o "sqlite", ver ``BACKENDS``); los métodos de clase de
+    Hotel, Customer y Reservation sólo usan esta interfaz. ``version``
+    cuenta las entidades modificadas (propias o de otros procesos); cada
+    entidad lleva además su propio ``version`` para control optimista.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+    version = 0
+
+    @classmethod
+    def location_for(cls, entity_cls):
+        """Regresa el archivo que respalda a la clase en este backend."""
+        raise NotImplementedError
+
+    @classmethod
+    def for_class(cls, entity_cls):
+        """Regresa el repositorio de la clase para su almacenamiento."""
+        backend = BACKENDS[entity_cls.STORAGE]
+        return Repository.instance_for(
+            (backend, entity_cls, backend.location_for(entity_cls)),
+            lambda key: backend(entity_cls, key[2]))
+
+    def changes_since(self, version):
+        """Regresa ``(versión, cambios, desde_cero)`` para ponerse al día
+        desde ``version``. Los cambios son pares (anterior, nueva), con
+        None si no existía o ya no existe; si el repositorio no conserva el
+        detalle, ``desde_cero`` es True y los cambios son todas las
+        entidades actuales como (None, entidad)."""
+        current = self.version
+        if current == version:
+            return current, [], False
+        return current, [(None, entity) for entity in self.all()], True
+
+    def batch(self, durable=True):
+        """Context manager que agrupa varias operaciones. Con
+        ``durable=False`` no espera el fsync al salir: quien lo pide llama
+        después ``commit()``."""
+        raise NotImplementedError
+
+    def commit(self):
+        """Hace durable lo escrito en lotes con ``durable=False``."""
+
+    def get(self, entity_id):
+        """Regresa la entidad con ese ID o None."""
+        raise NotImplementedError
+
+    def all(self):
+        """Regresa todas las entidades en orden de inserción."""
+        raise NotImplementedError
+
+    def find(self, field, value):
+        """Regresa las entidades con ``field == value`` vía un índice."""
+        raise NotImplementedError
+
+    def add(self, entity):
+        """Agrega (o reemplaza por ID) una entidad y la persiste."""
+        raise NotImplementedError
+
+    def remove(self, entity_id, expected_version=None):
+        """Elimina una entidad por ID; regresa la entidad o None. Con
+        ``expected_version`` lanza VersionConflict si la entidad cambió."""
+        raise NotImplementedError
+
+    def update(self, entity_id, expected_version=None, **changes):
+        """Guarda una copia de la entidad con los campos cambiados y la
+        regresa (None si no existe). Con ``expected_version`` lanza
+        VersionConflict si la entidad cambió desde que se leyó."""
+        raise NotImplementedError
+
+    def add_many(self, entities):
+        """Agrega varias entidades en una sola operación."""
+        with self.batch():
+            for entity in entities:
+                self.add(entity)
+
+    def update_many(self, changes_by_id):
+        """Aplica pares (id, {campo: valor}); regresa cuántos existían."""
+        with self.batch():
+            return sum(self.update(entity_id, **changes) is not None
+                       for entity_id, changes in changes_by_id)
+
+    def remove_many(self, entity_ids):
+        """Elimina varias entidades; regresa cuántas existían."""
+        with self.batch():
+            return sum(self.remove(entity_id) is not None
+                       for entity_id in entity_ids)
+
+
+class EntityTable:
+    """Entidades por ID (en orden de inserción) y un índice secundario por
+    cada campo de ``INDEXES`` de la clase (valor -> {id: entidad})."""
+
+    def __init__(self, entity_cls):
+        self.id_field = entity_cls.ID_FIELD
+        self.entities = {}
+        self.indexes = {field: {} for field in entity_cls.INDEXES}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def get(self, entity_id):
+        """Regresa la entidad con ese ID o None."""
+        return self.entities.get(entity_id)
+
+    def values(self):
+        """Regresa todas las entidades en orden de inserción."""
+        return list(self.entities.values())
+
+    def find(self, field, value):
+        """Regresa las entidades con ``field == value``."""
+        return list(self.indexes[field].get(value, {}).values())
+
+    def put(self, entity):
+        """Agrega o reemplaza por ID; regresa la entidad anterior o None."""
+        entity_id = getattr(entity, self.id_field)
+        previous = self.discard(entity_id)
+        self.entities[entity_id] = entity
+        for field, index in self.indexes.items():
+            index.setdefault(getattr(entity, field), {})[entity_id] = entity
+        return previous
+
+    def discard(self, entity_id):
+        """Quita una entidad por ID; regresa la entidad o None."""
+        entity = self.entities.pop(entity_id, None)
+        if entity is None:
+            return None
+        for field, index in self.indexes.items():
+            bucket = index[getattr(entity, field)]
+            del bucket[entity_id]
+            if not bucket:
+                del index[getattr(entity, field)]
+        return entity
+
+
+class History:
+    """Contador de versión con los últimos cambios (anterior, nueva).
+
+    Cada cambio suma uno a ``version``; ``restart`` la avanza sin detalle
+    (recarga completa), así que ``since`` sólo contesta si todos los
+    cambios que faltan siguen guardados.
+    """
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.version = 0
+        self.recent = deque(maxlen=size)
+
+    def record(self, previous, current):
+        """Registra que ``previous`` pasó a ser ``current``."""
+        self.recent.append((previous, current))
+        self.version += 1
+
+    def restart(self):
+        """Avanza la versión olvidando el detalle."""
+        self.recent.clear()
+        self.version += 1
+
+    def since(self, version):
+        """Cambios posteriores a ``version`` o None si ya no se tienen."""
+        if version is None or not 0 <= self.version - version <= len(
+                self.recent):
+            return None
+        return list(islice(self.recent,
+                           len(self.recent) - (self.version - version),
+                           None))
+
+
+class JournalCursor:
+    """Qué tanto del disco refleja un repositorio JSON: la identidad del
+    snapshot que cargó (inodo, mtime, tamaño) y los bytes y registros del
+    journal que ya aplicó."""
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.journal = Journal.for_path(journal_path(data_file))
+        self.stamp = False  # Nunca coincide: primera carga.
+        self.offset = 0  # Bytes del journal ya aplicados.
+        self.records = 0
+
+    def snapshot_stamp(self):
+        """Identidad del DATA_FILE actual (None si no existe)."""
+        try:
+            stat = os.stat(self.data_file)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def journal_size(self):
+        """Tamaño actual del journal en bytes."""
+        try:
+            return os.path.getsize(self.journal.path)
+        except OSError:
+            return 0
+
+    def restart(self, stamp):
+        """Apunta al final del journal actual del snapshot ``stamp``."""
+        try:
+            with open(self.journal.path, "rb") as file:
+                data = file.read()
+        except OSError:
+            data = b""
+        self.offset = data.rfind(b"\n") + 1
+        self.records = data.count(b"\n")
+        self.stamp = stamp
+
+    def read_tail(self):
+        """Regresa los registros completos después de ``offset`` y avanza."""
+        with open(self.journal.path, "rb") as file:
+            file.seek(self.offset)
+            data = file.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        self.offset += len(complete)
+        records = [json.loads(line) for line in complete.splitlines()]
+        self.records += len(records)
+        return records
+
+
+class JsonRepository(Repository):
+    """Repositorio en memoria respaldado por JSON + journal.
+
+    Mantiene las entidades en una ``EntityTable``. Cada mutación se agrega
+    al journal en lugar de reescribir el DATA_FILE, y cuando el journal
+    supera el tamaño del estado se compacta en un nuevo snapshot, así que
+    el costo por escritura no crece con los datos.
+
+    Las lecturas toman el lock compartido del DATA_FILE y las escrituras el
+    exclusivo; antes de cada operación el repositorio aplica sólo los
+    registros que otros procesos agregaron al journal (y recarga todo si
+    alguien escribió un snapshot). Dentro de ``batch()`` el lock exclusivo
+    se mantiene y se hace un solo fsync al salir. ``history`` guarda los
+    cambios recientes, propios o aplicados del journal, para
+    ``changes_since``.
+    """
+
+    @classmethod
+    def location_for(cls, entity_cls):
+        return os.path.abspath(entity_cls.DATA_FILE)
+
+    def __init__(self, entity_cls, data_file):
+        self.entity_cls = entity_cls
+        self.cursor = JournalCursor(data_file)
+        self.file_lock = FileLock.for_path(lock_path(data_file))
+        self.table = EntityTable(entity_cls)
+        self.history = History()
+        self.batching = 0
+        self.lock = threading.RLock()
+
+    @property
+    def version(self):
+        """Cambios vistos por el repositorio (propios y de otros)."""
+        return self.history.version
+
+    def _refresh(self):
+        """Se pone al día con el disco (con el lock del archivo tomado)."""
+        stamp = self.cursor.snapshot_stamp()
+        size = self.cursor.journal_size()
+        if stamp != self.cursor.stamp or size < self.cursor.offset:
+            self._reload(stamp)
+        elif size > self.cursor.offset:
+            for record in self.cursor.read_tail():
+                if record["op"] == "put":
+                    entity = self.entity_cls(**record["data"])
+                    self.history.record(self.table.put(entity), entity)
+                else:
+                    self.history.record(self.table.discard(record["id"]),
+                                        None)
+
+    def _reload(self, stamp):
+        """Recarga snapshot + journal completos. Un error de lectura se
+        propaga y deja el estado anterior: tomarlo como vacío haría que la
+        siguiente compactación guardara una tabla vacía."""
+        table = EntityTable(self.entity_cls)
+        for entity in read_state(self.entity_cls):
+            table.put(entity)
+        self.table = table
+        self.cursor.restart(stamp)
+        self.history.restart()
+
+    def _check_version(self, entity, expected_version):
+        if expected_version is not None and \
+                entity.version != expected_version:
+            raise VersionConflict(
+                f"{self.entity_cls.__name__} "
+                f"{getattr(entity, self.entity_cls.ID_FIELD)}: versión "
+                f"{entity.version}, se esperaba {expected_version}")
+
+    def _log(self, record):
+        """Agrega un registro al journal; regresa su secuencia."""
+        sequence, self.cursor.offset = self.cursor.journal.append(record)
+        self.cursor.records += 1
+        return sequence
+
+    def _commit(self, sequence):
+        """fsync fuera de los locks (group commit) y compactación si toca."""
+        if self.batching:
+            return
+        self.cursor.journal.commit(sequence)
+        with self.lock:
+            if self.cursor.records > max(COMPACT_MIN_RECORDS,
+                                         len(self.table)):
+                self.compact()
+
+    def compact(self):
+        """Escribe el estado como snapshot en DATA_FILE y vacía el journal.
+
+        También sirve para exportar: el DATA_FILE queda con todo el estado.
+        """
+        with self.lock, self.file_lock.exclusive():
+            self._refresh()
+            self.entity_cls.save_to_file(self.table.values())
+            stamp = self.cursor.snapshot_stamp()
+            if stamp != self.cursor.stamp and not self.cursor.journal_size():
+                # Es nuestro snapshot: la memoria ya coincide, sin recargar.
+                self.cursor.restart(stamp)
+            else:
+                self._refresh()
+
+    def changes_since(self, version):
+        with self.lock, self.file_lock.shared():
+            self._refresh()
+            changes = self.history.since(version)
+            if changes is None:
+                return self.version, [(None, entity)
+                                      for entity in self.table.values()], True
+            return self.version, changes, False
+
+    @contextmanager
+    def batch(self, durable=True):
+        """Agrupa operaciones con el lock exclusivo y un solo fsync, ya
+        sin los locks."""
+        try:
+            with self.lock, self.file_lock.exclusive():
+                self.batching += 1
+                try:
+                    self._refresh()
+                    yield self
+                finally:
+                    self.batching -= 1
+        finally:
+            if durable:
+                self._commit(None)
+
+    def commit(self):
+        self._commit(None)
+
+    def get(self, entity_id):
+        with self.lock, self.file_lock.shared():
+            self._refresh()
+            return self.table.get(entity_id)
+
+    def all(self):
+        with self.lock, self.file_lock.shared():
+            self._refresh()
+            return self.table.values()
+
+    def find(self, field, value):
+        with self.lock, self.file_lock.shared():
+            self._refresh()
+            return self.table.find(field, value)
+
+    def add(self, entity):
+        with self.lock, self.file_lock.exclusive():
+            self._refresh()
+            previous = self.table.put(entity)
+            entity.version = (previous.version if previous else 0) + 1
+            self.history.record(previous, entity)
+            sequence = self._log({"op": "put", "data": entity.to_dict()})
+        self._commit(sequence)
+
+    def remove(self, entity_id, expected_version=None):
+        with self.lock, self.file_lock.exclusive():
+            self._refresh()
+            entity = self.table.get(entity_id)
+            if entity is None:
+                return None
+            self._check_version(entity, expected_version)
+            self.table.discard(entity_id)
+            self.history.record(entity, None)
+            sequence = self._log({"op": "del", "id": entity_id})
+        self._commit(sequence)
+        return entity
+
+    def update(self, entity_id, expected_version=None, **changes):
+        with self.lock, self.file_lock.exclusive():
+            self._refresh()
+            entity = self.table.get(entity_id)
+            if entity is None:
+                return None
+            self._check_version(entity, expected_version)
+            # Entidad nueva: la anterior puede seguir en ``history``.
+            updated = self.entity_cls(**{**entity.to_dict(), **changes,
+                                         "version": entity.version + 1})
+            self.table.put(updated)
+            self.history.record(entity, updated)
+            sequence = self._log({"op": "put", "data": updated.to_dict()})
+        self._commit(sequence)
+        return updated
+
+
+class SqliteDatabase(Registry):
+    """Conexión SQLite compartida por los repositorios de un archivo.
+
+    Una sola conexión reutilizada; las sentencias se preparan una vez y
+    quedan en la caché de sentencias de sqlite3. ``transaction`` anida: sólo
+    la transacción externa hace BEGIN y COMMIT (o ROLLBACK si hubo error);
+    las de escritura usan BEGIN IMMEDIATE, que serializa a los escritores
+    de todos los procesos. ``PRAGMA data_version`` detecta los commits de
+    otras conexiones.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False,
+            cached_statements=256)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.data_version = None
+        self.external_changes = 0
+        self.check_external()
+
+    @classmethod
+    def for_path(cls, path):
+        """Regresa la base de datos compartida de esa ruta."""
+        return cls.instance_for(os.path.abspath(path), cls)
+
+    def check_external(self):
+        """Cuenta si otra conexión hizo commit desde la última revisión."""
+        with self.lock:
+            data_version = self.connection.execute(
+                "PRAGMA data_version").fetchone()[0]
+            if data_version != self.data_version:
+                if self.data_version is not None:
+                    self.external_changes += 1
+                self.data_version = data_version
+
+    @contextmanager
+    def transaction(self, write=False):
+        """Transacción (anidable) con el lock de la conexión tomado."""
+        with self.lock:
+            if not self.depth:
+                self.connection.execute(
+                    "BEGIN IMMEDIATE" if write else "BEGIN")
+                self.check_external()
+            self.depth += 1
+            try:
+                yield self.connection
+            except BaseException:
+                self.depth -= 1
+                if not self.depth:
+                    self.connection.execute("ROLLBACK")
+                raise
+            self.depth -= 1
+            if not self.depth:
+                self.connection.execute("COMMIT")
+
+    def close(self):
+        """Cierra la conexión y olvida los repositorios que la usaban."""
+        SqliteDatabase.forget(lambda database: database is self)
+        Repository.forget(
+            lambda repository: getattr(repository, "database", None) is self)
+        self.connection.close()
+
+
+class SqliteRepository(Repository):
+    """Repositorio respaldado por una tabla SQLite (``TABLE``).
+
+    El ID es la llave primaria y cada campo de ``INDEXES`` (ubicación del
+    hotel, llaves foráneas de la reservación) tiene su índice, así que
+    ``get``, ``find`` y los borrados no recorren la tabla. Las columnas no
+    declaran tipo para conservar los IDs tal cual (int o str). La columna
+    ``version`` se incrementa en cada escritura; ``update`` sólo escribe
+    si la versión sigue siendo la leída.
+    """
+
+    @classmethod
+    def location_for(cls, entity_cls):
+        return os.path.abspath(entity_cls.DATABASE_FILE)
+
+    def __init__(self, entity_cls, database_file):
+        self.entity_cls = entity_cls
+        self.database = SqliteDatabase.for_path(database_file)
+        self.changes = 0
+        fields = entity_cls.FIELDS
+        table = entity_cls.TABLE
+        id_field = entity_cls.ID_FIELD
+        columns = ", ".join(fields)
+        self.sql = {
+            "select": f"SELECT {columns} FROM {table} WHERE {id_field} = ?",
+            "version": f"SELECT version FROM {table} WHERE {id_field} = ?",
+            "all": f"SELECT {columns} FROM {table} ORDER BY rowid",
+            "find": f"SELECT {columns} FROM {table} WHERE {{}} = ? "
+                    "ORDER BY rowid",
+            "upsert": f"INSERT INTO {table} ({columns}) "
+                      f"VALUES ({', '.join('?' * len(fields))}) "
+                      f"ON CONFLICT({id_field}) DO UPDATE SET "
+                      + ", ".join(f"{field} = excluded.{field}"
+                                  for field in fields
+                                  if field not in (id_field, "version"))
+                      + f", version = {table}.version + 1",
+            "update": f"UPDATE {table} SET "
+                      + ", ".join(f"{field} = ?" for field in fields)
+                      + f" WHERE {id_field} = ? AND version = ?",
+            "delete": f"DELETE FROM {table} WHERE {id_field} = ?",
+        }
+        with self.database.transaction(write=True) as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({fields[0]} "
+                f"PRIMARY KEY, {', '.join(fields[1:])})")
+            existing = {row[1] for row in connection.execute(
+                f"PRAGMA table_info({table})")}
+            for field in fields:
+                if field not in existing:  # Tabla de una versión anterior.
+                    connection.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {field}"
+                        + (" DEFAULT 0" if field == "version" else ""))
+            for field in entity_cls.INDEXES:
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{field} "
+                    f"ON {table} ({field})")
+
+    @property
+    def version(self):
+        """Cambios propios más commits de otras conexiones."""
+        if not self.database.depth:
+            self.database.check_external()
+        return self.changes + self.database.external_changes
+
+    def _row(self, entity, **overrides):
+        return tuple(overrides[field] if field in overrides
+                     else getattr(entity, field)
+                     for field in self.entity_cls.FIELDS)
+
+    def _entity(self, row):
+        return self.entity_cls(*row) if row else None
+
+    def batch(self, durable=True):
+        """Agrupa varias operaciones en una sola transacción de escritura
+        (el COMMIT ya es el punto durable; ``durable`` no cambia nada)."""
+        return self.database.transaction(write=True)
+
+    def get(self, entity_id):
+        with self.database.transaction() as connection:
+            return self._entity(connection.execute(
+                self.sql["select"], (entity_id,)).fetchone())
+
+    def all(self):
+        with self.database.transaction() as connection:
+            return [self._entity(row)
+                    for row in connection.execute(self.sql["all"])]
+
+    def find(self, field, value):
+        if field not in self.entity_cls.INDEXES:
+            raise KeyError(field)
+        with self.database.transaction() as connection:
+            return [self._entity(row) for row in connection.execute(
+                self.sql["find"].format(field), (value,))]
+
+    def add(self, entity):
+        entity_id = getattr(entity, self.entity_cls.ID_FIELD)
+        with self.database.transaction(write=True) as connection:
+            connection.execute(self.sql["upsert"],
+                               self._row(entity, version=1))
+            entity.version = connection.execute(
+                self.sql["version"], (entity_id,)).fetchone()[0]
+            self.changes += 1
+
+    def add_many(self, entities):
+        """Agrega varias entidades con un solo executemany (la versión de
+        los objetos recibidos no se actualiza)."""
+        rows = [self._row(entity, version=1) for entity in entities]
+        with self.database.transaction(write=True) as connection:
+            connection.executemany(self.sql["upsert"], rows)
+            self.changes += len(rows)
+
+    def remove(self, entity_id, expected_version=None):
+        with self.database.transaction(write=True) as connection:
+            entity = self.get(entity_id)
+            if entity is None:
+                return None
+            if expected_version is not None and \
+                    entity.version != expected_version:
+                raise VersionConflict(
+                    f"{self.entity_cls.__name__} {entity_id}: versión "
+                    f"{entity.version}, se esperaba {expected_version}")
+            connection.execute(self.sql["delete"], (entity_id,))
+            self.changes += 1
+            return entity
+
+    def update(self, entity_id, expected_version=None, **changes):
+        with self.database.transaction(write=True) as connection:
+            entity = self.get(entity_id)
+            if entity is None:
+                return None
+            current = entity.version
+            if expected_version is not None and current != expected_version:
+                raise VersionConflict(
+                    f"{self.entity_cls.__name__} {entity_id}: versión "
+                    f"{current}, se esperaba {expected_version}")
+            for field, value in changes.items():
+                setattr(entity, field, value)
+            entity.version = current + 1
+            cursor = connection.execute(
+                self.sql["update"], self._row(entity) + (entity_id, current))
+            if not cursor.rowcount:
+                raise VersionConflict(
+                    f"{self.entity_cls.__name__} {entity_id} cambió")
+            self.changes += 1
+            return entity
+
+    def import_json(self):
+        """Carga el DATA_FILE (JSON + journal) en la tabla."""
+        self.add_many(self.entity_cls.load_from_file())
+
+    def export_json(self):
+        """Escribe el contenido de la tabla como snapshot en DATA_FILE."""
+        self.entity_cls.save_to_file(self.all())
+
+
+BACKENDS = {"json": JsonRepository, "sqlite": SqliteRepository}
+
+
+@contextmanager
+def batch_all(repositories):
+    """Un ``batch()`` sobre varios repositorios con los locks tomados en
+    ese orden; los fsync se hacen al final, ya sin ningún lock tomado."""
+    repositories = list(repositories)
+    try:
+        with ExitStack() as stack:
+            for repository in repositories:
+                stack.enter_context(repository.batch(durable=False))
+            yield repositories
+    finally:
+        for repository in repositories:
+            repository.commit()
+
+
+def _reset_after_fork():
+    """En un proceso hijo no se reutilizan los locks, archivos ni
+    conexiones del padre: los registros empiezan vacíos (los objetos del
+    padre se conservan sin cerrarlos)."""
+    for owner in (FileLock, Journal, SqliteDatabase, Repository):
+        _FORK_LEFTOVERS.append(owner.reset())
+
+
+_FORK_LEFTOVERS = []
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
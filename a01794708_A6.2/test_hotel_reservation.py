@@ -1,10 +1,53 @@
 """Pruebas unitarias"""
+import json
+import multiprocessing
+import os
+import tempfile
 import unittest
-from hotel_reservation import Hotel, Customer, Reservation
+from datetime import date, timedelta
+from unittest import mock
+from hotel_reservation import (
+    Hotel, Customer, Reservation, Availability, OccupancyTree)
+from storage import (
+    FileLock, Repository, SqliteDatabase, VersionConflict, batch_all,
+    journal_path, lock_path)
 
+STRESS_WORKERS = 4
+STRESS_BOOKINGS = 25  # Por proceso; 5 noches x 10 habitaciones = 50 caben.
 
-class TestHotelReservation(unittest.TestCase):
-    """Pruebas unitarias para el sistema de reservas."""
+
+def use_storage(directory, storage):
+    """Apunta las tres clases a archivos de ``directory``."""
+    for entity_cls in (Hotel, Customer, Reservation):
+        entity_cls.DATA_FILE = os.path.join(
+            directory, entity_cls.TABLE + ".json")
+        entity_cls.DATABASE_FILE = os.path.join(directory, "reservas.db")
+        entity_cls.STORAGE = storage
+
+
+def stress_worker(directory, storage, worker):
+    """Proceso de la prueba de estrés: reserva noches del hotel 1 e
+    incrementa un contador (rooms del hotel 2) con control optimista."""
+    use_storage(directory, storage)
+    booked = 0
+    for number in range(STRESS_BOOKINGS):
+        night = date(2025, 1, 1) + timedelta(days=number % 5)
+        booked += Reservation.create_reservation(
+            worker * 1000 + number, worker, 1, night.isoformat(),
+            (night + timedelta(days=1)).isoformat())
+        while True:
+            hotel = Repository.for_class(Hotel).get(2)
+            try:
+                Repository.for_class(Hotel).update(
+                    2, hotel.version, rooms=hotel.rooms + 1)
+                break
+            except VersionConflict:
+                continue
+    return booked
+
+
+class EntityTestCase(unittest.TestCase):
+    """Base de las pruebas: un hotel, un cliente y una reservación."""
 
     def setUp(self):
         """Configura el entorno antes de cada prueba."""
@@ -12,6 +55,10 @@ class TestHotelReservation(unittest.TestCase):
         self.customer = Customer(1, "pedro hurtado", "pedrohurtado@gmail.com")
         self.reservation = Reservation(1, 1, 1)
 
+
+class TestHotelReservation(EntityTestCase):
+    """Pruebas unitarias para el sistema de reservas."""
+
     def test_create_hotel(self):
         """Prueba la creación de un hotel."""
         print("Prueba la creación de un hotel.")
@@ -167,5 +214,325 @@ class TestHotelReservation(unittest.TestCase):
         self.assertEqual(len(loaded_reservations), 0)
 
 
+class TestStorage(EntityTestCase):
+    """Pruebas de los repositorios, el journal y los backends."""
+
+    def test_secondary_indexes(self):
+        """Prueba las búsquedas por índices secundarios."""
+        print("prueba indices secundarios")
+        print("--------------------------------")
+        Hotel.save_to_file([self.hotel])
+        Hotel.create_hotel(2, "Hotel Sol", "quito", 20)
+        Hotel.create_hotel(3, "Hotel Luna", "cuenca", 10)
+        self.assertEqual(
+            [hotel.hotel_id for hotel in Hotel.find_by_location("cuenca")],
+            [1, 3])
+        Hotel.modify_hotel_info(3, location="quito")
+        self.assertEqual(
+            [hotel.hotel_id for hotel in Hotel.find_by_location("quito")],
+            [2, 3])
+        Reservation.save_to_file([self.reservation])
+        Reservation.create_reservation(2, 1, 2)
+        Reservation.create_reservation(3, 2, 2)
+        self.assertEqual(len(Reservation.find_by_customer(1)), 2)
+        Reservation.cancel_reservation(2)
+        self.assertEqual(
+            [res.reservation_id for res in Reservation.find_by_hotel(2)],
+            [3])
+
+    def test_batch_writes_once(self):
+        """Prueba que batch() agrupa las escrituras en un solo fsync."""
+        print("prueba escritura agrupada")
+        print("--------------------------------")
+        Customer.save_to_file([])
+        with mock.patch.object(Customer, "save_to_file",
+                               wraps=Customer.save_to_file) as save, \
+                mock.patch("storage.os.fsync",
+                           wraps=os.fsync) as fsync:
+            with Repository.for_class(Customer).batch():
+                for customer_id in range(100):
+                    Customer.create_customer(
+                        customer_id, "cliente", "cliente@gmail.com")
+            self.assertEqual(save.call_count, 0)
+            self.assertEqual(fsync.call_count, 1)
+        self.assertEqual(len(Customer.load_from_file()), 100)
+
+    def test_batch_all_fsyncs_without_locks(self):
+        """Prueba que batch_all hace los fsync ya sin locks tomados."""
+        print("prueba fsync fuera de los locks")
+        print("--------------------------------")
+        classes = (Reservation, Hotel, Customer)
+        locks = [FileLock.for_path(lock_path(entity_cls.DATA_FILE))
+                 for entity_cls in classes]
+        held = []
+
+        def fsync(_):
+            held.append([lock.mode for lock in locks])
+
+        with mock.patch("storage.os.fsync", side_effect=fsync):
+            with batch_all(Repository.for_class(entity_cls)
+                           for entity_cls in classes):
+                Hotel.create_hotel(7, "Hotel Sol", "cuenca", 3)
+                Customer.create_customer(7, "ana", "ana@gmail.com")
+        self.assertEqual(held, [[0, 0, 0], [0, 0, 0]])
+
+    def test_journal_replay_and_compaction(self):
+        """Prueba el replay del journal y la compactación en snapshot."""
+        print("prueba journal y compactacion")
+        print("--------------------------------")
+        Reservation.save_to_file([self.reservation])
+        Reservation.create_reservation(2, 1, 1)
+        Reservation.cancel_reservation(1)
+        with open(Reservation.DATA_FILE, "r", encoding="utf-8") as file:
+            self.assertEqual(len(json.load(file)), 1)
+        with open(journal_path(Reservation.DATA_FILE), "a",
+                  encoding="utf-8") as file:
+            file.write('{"op": "put", "data": {"reser')  # escritura rota
+        self.assertEqual(
+            [res.reservation_id for res in Reservation.load_from_file()],
+            [2])
+        Repository.for_class(Reservation).compact()
+        self.assertEqual(
+            os.path.getsize(journal_path(Reservation.DATA_FILE)), 0)
+        with open(Reservation.DATA_FILE, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file)[0]["reservation_id"], 2)
+
+    def test_unreadable_snapshot_keeps_state(self):
+        """Prueba que un snapshot ilegible se reporta y no vacía el
+        repositorio."""
+        print("prueba snapshot ilegible")
+        print("--------------------------------")
+        Customer.save_to_file([self.customer])
+        repository = Repository.for_class(Customer)
+        self.assertIsNotNone(repository.get(1))
+        with open(Customer.DATA_FILE, "w", encoding="utf-8") as file:
+            file.write("[{")
+        with self.assertRaises(json.JSONDecodeError):
+            repository.get(1)
+        Customer.save_to_file([self.customer])
+        self.assertEqual(repository.get(1).name, "pedro hurtado")
+
+    def test_repository_sees_external_changes(self):
+        """Prueba que el repositorio recarga si el archivo cambia."""
+        print("prueba cambios externos")
+        print("--------------------------------")
+        Customer.save_to_file([self.customer])
+        self.assertIsNotNone(Repository.for_class(Customer).get(1))
+        Customer.save_to_file(
+            [Customer(2, "ana", "ana@gmail.com"),
+             Customer(3, "luis", "luis@gmail.com")])
+        self.assertIsNone(Repository.for_class(Customer).get(1))
+        self.assertEqual(Repository.for_class(Customer).get(2).name, "ana")
+
+    def test_sqlite_backend(self):
+        """Prueba las mismas operaciones con el backend SQLite."""
+        print("prueba backend sqlite")
+        print("--------------------------------")
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, "reservas.db")
+            classes = (Hotel, Customer, Reservation)
+            for entity_cls in classes:
+                entity_cls.STORAGE = "sqlite"
+                entity_cls.DATABASE_FILE = database
+            try:
+                Hotel.create_hotels_many(
+                    [(1, "Sol", "cuenca", 10), (2, "Luna", "quito", 5)])
+                Customer.create_customer(1, "ana", "ana@gmail.com")
+                Reservation.create_reservations_many(
+                    [(1, 1, 1), (2, 1, 2), (3, 2, 2)])
+                Hotel.modify_hotel_info(2, location="cuenca")
+                Reservation.cancel_reservation(2)
+                self.assertEqual(
+                    [hotel.name for hotel in Hotel.find_by_location("cuenca")],
+                    ["Sol", "Luna"])
+                self.assertEqual(
+                    [res.reservation_id
+                     for res in Reservation.find_by_customer(1)], [1])
+                self.assertEqual(
+                    Repository.for_class(Customer).get(1).email,
+                    "ana@gmail.com")
+                self.assertEqual(
+                    Repository.for_class(Reservation).update_many(
+                        [(1, {"hotel_id": 2}), (9, {"hotel_id": 2})]), 1)
+                self.assertEqual(len(Reservation.find_by_hotel(2)), 2)
+            finally:
+                for entity_cls in classes:
+                    entity_cls.STORAGE = "json"
+                SqliteDatabase.for_path(os.path.abspath(database)).close()
+                for entity_cls in classes:
+                    entity_cls.DATABASE_FILE = "hotel_reservation.db"
+
+    def test_columnar_snapshot(self):
+        """Prueba el snapshot por columnas y la representación compacta."""
+        print("prueba snapshot por columnas")
+        print("--------------------------------")
+        reservations = [Reservation(1, 1, 1, "2025-01-01", "2025-01-02"),
+                        Reservation(2, 1, 1, "2025-01-01", "2025-01-03")]
+        Reservation.SNAPSHOT_FORMAT = "columns"
+        try:
+            Reservation.save_to_file(reservations)
+            with open(Reservation.DATA_FILE, "r", encoding="utf-8") as file:
+                self.assertEqual(json.load(file)["columns"][0], [1, 2])
+            loaded = Reservation.load_from_file()
+        finally:
+            Reservation.SNAPSHOT_FORMAT = "rows"
+        self.assertEqual([res.to_dict() for res in loaded],
+                         [res.to_dict() for res in reservations])
+        self.assertIs(loaded[0].check_in, loaded[1].check_in)
+        self.assertFalse(hasattr(loaded[0], "__dict__"))
+
+    def test_version_conflict(self):
+        """Prueba la detección optimista de conflictos."""
+        print("prueba conflicto de version")
+        print("--------------------------------")
+        Hotel.save_to_file([self.hotel])
+        version = Repository.for_class(Hotel).get(1).version
+        self.assertTrue(Hotel.modify_hotel_info(
+            1, rooms=60, expected_version=version))
+        self.assertFalse(Hotel.modify_hotel_info(
+            1, rooms=70, expected_version=version))
+        self.assertEqual(Hotel.load_from_file()[0].rooms, 60)
+
+
+class TestAvailability(EntityTestCase):
+    """Pruebas de disponibilidad por fechas y concurrencia."""
+
+    def test_availability_and_overbooking(self):
+        """Prueba la detección de sobreventa y la búsqueda por fechas."""
+        print("prueba disponibilidad")
+        print("--------------------------------")
+        Hotel.save_to_file([self.hotel, Hotel(2, "Hotel Sol", "cuenca", 1)])
+        Reservation.save_to_file([])
+        self.assertTrue(Reservation.create_reservation(
+            1, 1, 2, "2025-03-01", "2025-03-04"))
+        self.assertFalse(Reservation.create_reservation(
+            2, 1, 2, "2025-03-03", "2025-03-05"))
+        self.assertTrue(Reservation.create_reservation(
+            3, 1, 2, "2025-03-04", "2025-03-06"))
+        self.assertEqual(Hotel.free_rooms(1, "2025-03-01", "2025-03-02"), 50)
+        self.assertEqual(Hotel.free_rooms(2, "2025-03-02", "2025-03-05"), 0)
+        self.assertEqual(
+            [hotel.hotel_id for hotel in
+             Hotel.find_available("2025-03-02", "2025-03-03", "cuenca")],
+            [1])
+        Reservation.cancel_reservation(1)
+        self.assertEqual(
+            len(Hotel.find_available("2025-03-02", "2025-03-03")), 2)
+        rejected = Reservation.create_reservations_many(
+            [(4, 1, 2, "2025-03-01", "2025-03-02"),
+             (5, 1, 2, "2025-03-01", "2025-03-03"),
+             (6, 1, 2, "2025-03-09", "2025-03-08")])
+        self.assertEqual([res.reservation_id for res in rejected], [5, 6])
+
+    def test_repeated_id_and_date_objects(self):
+        """Prueba IDs repetidos en un lote y fechas como ``date``."""
+        print("prueba ids repetidos y fechas date")
+        print("--------------------------------")
+        Hotel.save_to_file([Hotel(1, "Hotel Sol", "cuenca", 1)])
+        Reservation.save_to_file([])
+        self.assertEqual(Reservation.create_reservations_many(
+            [(1, 1, 1, "2025-01-01", "2025-01-02"),
+             (1, 1, 1, "2025-02-01", "2025-02-02")]), [])
+        self.assertEqual(Hotel.free_rooms(1, "2025-01-01", "2025-01-02"), 1)
+        self.assertEqual(Hotel.free_rooms(1, "2025-02-01", "2025-02-02"), 0)
+        self.assertTrue(Reservation.create_reservation(
+            2, 1, 1, date(2025, 3, 1), date(2025, 3, 5)))
+        stored = {res.reservation_id: res.check_in
+                  for res in Reservation.load_from_file()}
+        self.assertEqual(stored, {1: "2025-02-01", 2: "2025-03-01"})
+        with self.assertRaises(TypeError):
+            Reservation(3, 1, 1, 20250301, 20250305)
+
+    def test_availability_follows_journal(self):
+        """Prueba que la disponibilidad aplica los registros que otro
+        proceso agregó al journal sin reconstruirse."""
+        print("prueba disponibilidad incremental")
+        print("--------------------------------")
+        Hotel.save_to_file([Hotel(1, "Hotel Sol", "cuenca", 1)])
+        Reservation.save_to_file([])
+        Reservation.create_reservation(1, 1, 1, "2025-01-01", "2025-01-02")
+        trees = Availability.for_class(Reservation).trees
+        moved = Reservation(2, 1, 1, "2025-02-01", "2025-02-02", 1)
+        with open(journal_path(Reservation.DATA_FILE), "a",
+                  encoding="utf-8") as file:
+            for record in ({"op": "del", "id": 1},
+                           {"op": "put", "data": moved.to_dict()}):
+                file.write(json.dumps(record) + "\n")
+        self.assertEqual(Hotel.free_rooms(1, "2025-01-01", "2025-01-02"), 1)
+        self.assertEqual(Hotel.free_rooms(1, "2025-02-01", "2025-02-02"), 0)
+        self.assertIs(Availability.for_class(Reservation).trees, trees)
+
+    def test_update_dates_twice(self):
+        """Prueba que dos cambios de fechas seguidos dejan bien la
+        ocupación (la historia no debe ver la entidad ya modificada)."""
+        print("prueba cambios de fechas seguidos")
+        print("--------------------------------")
+        Hotel.save_to_file([Hotel(1, "Hotel Sol", "cuenca", 1)])
+        Reservation.save_to_file([])
+        Reservation.create_reservation(1, 1, 1, "2025-01-01", "2025-01-02")
+        repository = Repository.for_class(Reservation)
+        first = repository.update(1, check_in="2025-02-01",
+                                  check_out="2025-02-02")
+        repository.update(1, check_in="2025-03-01", check_out="2025-03-02")
+        self.assertEqual(first.check_in, "2025-02-01")
+        for night in ("2025-01-01", "2025-02-01"):
+            self.assertEqual(Hotel.free_rooms(1, night, night[:-1] + "2"),
+                             1)
+        self.assertEqual(Hotel.free_rooms(1, "2025-03-01", "2025-03-02"), 0)
+
+    def test_occupancy_tree(self):
+        """Compara el árbol de ocupación con un conteo noche por noche."""
+        print("prueba arbol de ocupacion")
+        print("--------------------------------")
+        tree = OccupancyTree()
+        nights = [0] * 40
+        stays = [(0, 5, 1), (3, 9, 1), (4, 5, 1), (10, 40, 1), (3, 9, 1),
+                 (39, 40, 1), (3, 9, -1)]
+        for start, end, delta in stays:
+            tree.add(700000 + start, 700000 + end, delta)
+            for night in range(start, end):
+                nights[night] += delta
+        for start in range(40):
+            for end in range(start + 1, 41):
+                self.assertEqual(tree.max(700000 + start, 700000 + end),
+                                 max(nights[start:end]))
+
+    def test_parallel_booking_stress(self):
+        """Varios procesos reservan y modifican a la vez sin perder
+        escrituras ni sobrevender, con ambos backends."""
+        print("prueba de estres multiproceso")
+        print("--------------------------------")
+        originals = {entity_cls: (entity_cls.DATA_FILE,
+                                  entity_cls.DATABASE_FILE)
+                     for entity_cls in (Hotel, Customer, Reservation)}
+        try:
+            for storage in ("json", "sqlite"):
+                with tempfile.TemporaryDirectory() as directory:
+                    use_storage(directory, storage)
+                    Hotel.create_hotels_many(
+                        [(1, "Sol", "cuenca", 10), (2, "Luna", "quito", 0)])
+                    with multiprocessing.Pool(STRESS_WORKERS) as pool:
+                        booked = pool.starmap(
+                            stress_worker,
+                            [(directory, storage, worker)
+                             for worker in range(STRESS_WORKERS)])
+                    reservations = Repository.for_class(Reservation).all()
+                    self.assertEqual(sum(booked), 50)
+                    self.assertEqual(len(reservations), 50)
+                    self.assertEqual(
+                        Hotel.free_rooms(1, "2025-01-01", "2025-01-06"), 0)
+                    self.assertEqual(
+                        Repository.for_class(Hotel).get(2).rooms,
+                        STRESS_WORKERS * STRESS_BOOKINGS)
+                    if storage == "sqlite":
+                        SqliteDatabase.for_path(
+                            Hotel.DATABASE_FILE).close()
+        finally:
+            for entity_cls, (data_file, database) in originals.items():
+                entity_cls.DATA_FILE = data_file
+                entity_cls.DATABASE_FILE = database
+                entity_cls.STORAGE = "json"
+
+
 if __name__ == "__main__":
     unittest.main()
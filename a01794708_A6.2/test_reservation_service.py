@@ -0,0 +1,183 @@
+"""Pruebas del servicio asyncio de reservaciones."""
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from hotel_reservation import Customer, Hotel, Reservation
+from reservation_service import (
+    ReservationClient, ReservationService, ServiceError, ThreadOutput,
+    load_test)
+from storage import Repository
+
+
+class TestReservationService(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de punta a punta contra una instancia local."""
+
+    async def asyncSetUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.originals = {}
+        for entity_cls in (Hotel, Customer, Reservation):
+            self.originals[entity_cls] = entity_cls.DATA_FILE
+            entity_cls.DATA_FILE = os.path.join(directory,
+                                                entity_cls.DATA_FILE)
+        self.service = ReservationService()
+        port = await self.service.start(port=0)
+        self.client = await ReservationClient().connect(port=port)
+        self.port = port
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.service.close()
+        for entity_cls, data_file in self.originals.items():
+            entity_cls.DATA_FILE = data_file
+
+    async def test_crud_round_trip(self):
+        """Prueba crear, consultar, modificar y borrar por el servicio."""
+        print("prueba servicio crud")
+        print("--------------------------------")
+        await self.client.call("create_hotel", hotel_id=1, name="Sol",
+                               location="cuenca", rooms=1)
+        self.assertTrue(await self.client.call(
+            "create_reservation", reservation_id=1, customer_id=1,
+            hotel_id=1, check_in="2025-01-01", check_out="2025-01-03"))
+        self.assertFalse(await self.client.call(
+            "create_reservation", reservation_id=2, customer_id=1,
+            hotel_id=1, check_in="2025-01-02", check_out="2025-01-04"))
+        self.assertTrue(await self.client.call(
+            "modify_hotel", hotel_id=1, rooms=5))
+        hotel = await self.client.call("display_hotel", entity_id=1)
+        self.assertEqual(hotel["rooms"], 5)
+        self.assertEqual(len(await self.client.call(
+            "find_available", check_in="2025-01-01",
+            check_out="2025-01-02")), 1)
+        await self.client.call("delete_hotel", hotel_id=1)
+        self.assertIsNone(
+            await self.client.call("display_hotel", entity_id=1))
+        with self.assertRaises(ServiceError):
+            await self.client.call("create_hotel", hotel_id=2)
+
+    async def test_concurrent_writes_are_batched(self):
+        """Prueba que escrituras concurrentes comparten lotes y persisten."""
+        print("prueba servicio escrituras agrupadas")
+        print("--------------------------------")
+        await asyncio.gather(*(
+            self.client.call("create_customer", customer_id=number,
+                             name="cliente", email="cliente@gmail.com")
+            for number in range(50)))
+        self.assertLess(self.service.flushes, 50)
+        self.assertEqual(len(Customer.load_from_file()), 50)
+
+    async def test_reads_do_not_block_event_loop(self):
+        """Prueba que una lectura que espera los locks de un lote no
+        detiene el event loop."""
+        print("prueba lecturas fuera del event loop")
+        print("--------------------------------")
+        await self.client.call("create_hotel", hotel_id=1, name="Sol",
+                               location="cuenca", rooms=1)
+        held = threading.Event()
+
+        def hold_writer_locks():
+            with Repository.for_class(Hotel).batch():
+                held.set()
+                time.sleep(0.2)
+
+        holder = threading.Thread(target=hold_writer_locks)
+        holder.start()
+        held.wait()
+        read = asyncio.ensure_future(
+            self.client.call("display_hotel", entity_id=1))
+        ticks = 0
+        while not read.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        holder.join()
+        self.assertEqual((await read)["name"], "Sol")
+        self.assertGreater(ticks, 5)
+
+    async def test_writer_survives_failed_batch(self):
+        """Prueba que si falla un lote se reporta y el escritor sigue."""
+        print("prueba servicio lote fallido")
+        print("--------------------------------")
+        with mock.patch.object(ReservationService, "_apply",
+                               side_effect=OSError("disco lleno")):
+            with self.assertRaises(ServiceError):
+                await self.client.call("create_customer", customer_id=1,
+                                       name="ana", email="ana@gmail.com")
+        await self.client.call("create_customer", customer_id=2,
+                               name="luis", email="luis@gmail.com")
+        self.assertEqual(
+            [customer.customer_id for customer in Customer.load_from_file()],
+            [2])
+
+    async def test_client_skips_unknown_ids(self):
+        """Prueba que el cliente ignora respuestas que no esperaba."""
+        print("prueba cliente ids desconocidos")
+        print("--------------------------------")
+
+        async def reply(reader, writer):
+            request = json.loads(await reader.readline())
+            for response_id in (request["id"] + 100, None, request["id"]):
+                writer.write(json.dumps(
+                    {"id": response_id, "ok": True, "result": response_id}
+                ).encode("utf-8") + b"\n")
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(reply, "127.0.0.1", 0)
+        client = await ReservationClient().connect(
+            port=server.sockets[0].getsockname()[1])
+        try:
+            self.assertEqual(
+                await client.call("display_hotel", entity_id=1), 1)
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+    async def test_load_generator(self):
+        """Prueba que el generador de carga reporta sus métricas."""
+        print("prueba generador de carga")
+        print("--------------------------------")
+        stats = await load_test(("127.0.0.1", self.port), clients=4,
+                                requests=200, hotels=5)
+        self.assertEqual(stats["requests"], 200)
+        self.assertGreater(stats["rps"], 0)
+        self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+
+
+class TestThreadOutput(unittest.TestCase):
+    """Pruebas de la captura de mensajes por hilo."""
+
+    def test_capture_is_per_thread(self):
+        """Prueba que sólo se captura lo que imprime el hilo que captura."""
+        output = ThreadOutput(io.StringIO())
+        inside = threading.Event()
+        printed = threading.Event()
+        captured = []
+
+        def worker():
+            with output.capture() as buffer:
+                inside.set()
+                printed.wait()
+                print("hilo", file=output)
+            captured.append(buffer.getvalue())
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        inside.wait()
+        print("principal", file=output)
+        printed.set()
+        thread.join()
+        self.assertEqual(captured, ["hilo\n"])
+        self.assertEqual(output.stream.getvalue(), "principal\n")
+
+
+if __name__ == "__main__":
+    unittest.main()